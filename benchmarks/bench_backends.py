@@ -0,0 +1,92 @@
+"""
+Benchmark dos backends de grafo do Modelo de Economia Vetorial
+
+Compara o backend de referência (Python puro e NetworkX) com o backend
+sobre scipy.sparse.csgraph em grafos mockados de tamanhos crescentes.
+
+Uso:
+    python benchmarks/bench_backends.py
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import numpy as np
+from src.models.vector_model import VectorialEconomicModel
+from src.utils.data_generator import MockDataGenerator
+
+
+def build_model(num_assets: int, backend: str, seed: int = 42) -> VectorialEconomicModel:
+    """
+    Cria um modelo com ativos e pools mockados.
+    """
+    data_generator = MockDataGenerator(num_assets=num_assets, seed=seed)
+    liquidity_data = data_generator.generate_liquidity_data()
+
+    model = VectorialEconomicModel(backend=backend)
+    for asset in data_generator.assets:
+        model.add_asset(asset, 1000000)
+    for _, row in liquidity_data.iterrows():
+        model.add_liquidity_pool(row['token_a'], row['token_b'], row['liquidity'],
+                                 swap_fee=row['fee_tier'])
+    return model
+
+
+def timeit(function, repeat: int) -> float:
+    """
+    Retorna o tempo médio em milissegundos de uma chamada.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(num_assets: int, repeat: int = 20) -> dict:
+    """
+    Mede as operações dos dois backends em um grafo com `num_assets` ativos.
+    """
+    rng = np.random.default_rng(0)
+    models = {backend: build_model(num_assets, backend) for backend in ('reference', 'csgraph')}
+    assets = list(models['reference'].assets)
+    pairs = [tuple(rng.choice(assets, size=2, replace=False)) for _ in range(repeat)]
+
+    results = {}
+    for backend, model in models.items():
+        def routes():
+            for asset_a, asset_b in pairs:
+                model.backend.shortest_route(asset_a, asset_b, 5000)
+
+        def widest():
+            for asset_a, asset_b in pairs:
+                model.widest_path_liquidity(asset_a, asset_b)
+
+        def reachable():
+            for asset_a, _ in pairs:
+                model.reachable_assets(asset_a, max_hops=3)
+
+        # A primeira chamada monta as estruturas em cache do backend
+        model.connected_components()
+        results[backend] = {
+            'rota': timeit(routes, 1) / len(pairs),
+            'gargalo': timeit(widest, 1) / len(pairs),
+            'alcance': timeit(reachable, 1) / len(pairs),
+            'componentes': timeit(model.connected_components, repeat),
+        }
+    return results
+
+
+def main():
+    print(f"{'ativos':>8} {'operação':>12} {'reference (ms)':>16} {'csgraph (ms)':>14} {'speedup':>9}")
+    for num_assets in (50, 200, 1000):
+        results = bench(num_assets)
+        for operation in results['reference']:
+            reference = results['reference'][operation]
+            compiled = results['csgraph'][operation]
+            print(f"{num_assets:>8} {operation:>12} {reference:>16.3f} {compiled:>14.3f} {reference / compiled:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
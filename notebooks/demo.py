@@ -39,10 +39,13 @@ def main():
     for _, row in market_data.iterrows():
         model.add_asset(row['asset'], row['liquidity_score'] * 1000000)
         # Adiciona outros atributos
-        model.assets[row['asset']]['volume'] = row['volume_24h']
-        model.assets[row['asset']]['price_impact'] = 1 - row['liquidity_score']
-        model.assets[row['asset']]['utility'] = np.random.uniform(0.1, 0.9)
-        model.assets[row['asset']]['confidence'] = np.random.uniform(0.1, 0.9)
+        model.update_asset(
+            row['asset'],
+            volume=row['volume_24h'],
+            price_impact=1 - row['liquidity_score'],
+            utility=np.random.uniform(0.1, 0.9),
+            confidence=np.random.uniform(0.1, 0.9)
+        )
     
     # Adiciona as pools de liquidez
     for _, row in liquidity_data.iterrows():
@@ -0,0 +1,303 @@
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+import networkx as nx
+
+from src.models.batched_routing import EdgeArrays, edge_costs
+
+try:
+    import scipy.sparse as sparse
+    from scipy.sparse import csgraph
+except ImportError:  # pragma: no cover - scipy é opcional
+    sparse = None
+    csgraph = None
+
+
+def widest_paths(neighbors, source: str) -> Dict[str, float]:
+    """
+    Dijkstra de gargalo: maior liquidez mínima de `source` até cada ativo.
+
+    Args:
+        neighbors: Função que retorna pares (vizinho, liquidez) de um ativo
+        source: Ativo de origem
+
+    Returns:
+        Dict[str, float]: Liquidez de gargalo de cada ativo alcançável
+    """
+    widths = {source: float('inf')}
+    heap = [(-float('inf'), source)]
+    done = set()
+    while heap:
+        width, node = heapq.heappop(heap)
+        if node in done:
+            continue
+        done.add(node)
+        for neighbor, liquidity in neighbors(node):
+            candidate = min(-width, liquidity)
+            if candidate > widths.get(neighbor, 0.0):
+                widths[neighbor] = candidate
+                heapq.heappush(heap, (-candidate, neighbor))
+    return widths
+
+
+class GraphBackend:
+    """
+    Interface dos algoritmos de grafo usados por VectorialEconomicModel.
+
+    A enumeração de rotas simples (`get_all_possible_routes` e
+    `calculate_indirect_liquidity`) não faz parte da interface: não há
+    rotina equivalente no csgraph, e ela continua com NetworkX.
+    """
+    name = None
+
+    def __init__(self, model=None):
+        """
+        Args:
+            model: Instância de VectorialEconomicModel (associada depois por
+                `create_backend` se omitida)
+        """
+        self.model = model
+
+    def invalidate(self):
+        """
+        Descarta estruturas derivadas do grafo após uma alteração.
+        """
+
+    def shortest_route(self, asset_a: str, asset_b: str, amount: float) -> Tuple[Optional[List[str]], float]:
+        """
+        Rota de menor custo (taxa + slippage) entre dois ativos.
+
+        Returns:
+            Tuple[Optional[List[str]], float]: Caminho e custo total, ou (None, inf) se não houver rota
+        """
+        raise NotImplementedError
+
+    def reachable(self, asset_id: str, max_hops: Optional[int] = None) -> List[str]:
+        """
+        Ativos alcançáveis a partir de um ativo, incluindo ele mesmo.
+        """
+        raise NotImplementedError
+
+    def widest_path(self, asset_a: str, asset_b: str) -> float:
+        """
+        Maior liquidez de gargalo entre dois ativos (0.0 se não houver rota).
+        """
+        raise NotImplementedError
+
+    def components(self) -> List[Set[str]]:
+        """
+        Componentes conexos do grafo de liquidez.
+        """
+        raise NotImplementedError
+
+
+class ReferenceBackend(GraphBackend):
+    """
+    Implementação de referência em Python puro e NetworkX.
+    """
+    name = 'reference'
+
+    def shortest_route(self, asset_a: str, asset_b: str, amount: float) -> Tuple[Optional[List[str]], float]:
+        graph = self.model.liquidity_graph
+
+        # Inicializa estruturas de dados
+        costs = {node: float('inf') for node in graph.nodes()}
+        costs[asset_a] = 0
+        predecessors = {node: None for node in graph.nodes()}
+        visited = set()
+
+        # Algoritmo de Dijkstra modificado
+        while len(visited) < len(graph.nodes()):
+            # Encontra o vértice não visitado com menor custo
+            current = min((node for node in graph.nodes() if node not in visited),
+                         key=lambda x: costs[x])
+
+            if current == asset_b:
+                break
+
+            visited.add(current)
+
+            # Atualiza os custos para os vizinhos
+            for neighbor in graph.neighbors(current):
+                if neighbor in visited:
+                    continue
+
+                # Calcula o custo de swap
+                liquidity = graph[current][neighbor]['weight']
+                swap_fee = graph[current][neighbor]['swap_fee']
+
+                # Se a quantidade é maior que a liquidez, o custo é infinito
+                if amount > liquidity:
+                    edge_cost = float('inf')
+                else:
+                    slippage = self.model.calculate_slippage(current, neighbor, amount)
+                    edge_cost = swap_fee + slippage
+
+                new_cost = costs[current] + edge_cost
+                if new_cost < costs[neighbor]:
+                    costs[neighbor] = new_cost
+                    predecessors[neighbor] = current
+
+        if costs[asset_b] == float('inf'):
+            return None, float('inf')
+
+        # Reconstrói a rota
+        path = []
+        current = asset_b
+        while current is not None:
+            path.insert(0, current)
+            current = predecessors[current]
+
+        return path, costs[asset_b]
+
+    def reachable(self, asset_id: str, max_hops: Optional[int] = None) -> List[str]:
+        return list(nx.single_source_shortest_path_length(self.model.liquidity_graph, asset_id, cutoff=max_hops))
+
+    def widest_path(self, asset_a: str, asset_b: str) -> float:
+        graph = self.model.liquidity_graph
+        widths = widest_paths(lambda node: ((v, data['weight']) for _, v, data in graph.out_edges(node, data=True)),
+                              asset_a)
+        return widths.get(asset_b, 0.0)
+
+    def components(self) -> List[Set[str]]:
+        return [set(component) for component in nx.weakly_connected_components(self.model.liquidity_graph)]
+
+
+class CSGraphBackend(GraphBackend):
+    """
+    Implementação sobre rotinas compiladas de `scipy.sparse.csgraph`.
+
+    As arestas são extraídas uma vez para arrays (invalidados por
+    `add_liquidity_pool`) e cada consulta monta uma matriz CSR com os pesos
+    necessários. Alterações feitas diretamente em `liquidity_graph` exigem
+    chamar `invalidate`.
+    """
+    name = 'csgraph'
+
+    def __init__(self, model=None):
+        if csgraph is None:
+            raise ImportError("O backend 'csgraph' requer scipy")
+        super().__init__(model)
+        self._edges = None
+        self._index = None
+        self._adjacency = None
+        self._spanning_tree = None
+
+    def invalidate(self):
+        self._edges = None
+        self._index = None
+        self._adjacency = None
+        self._spanning_tree = None
+
+    @property
+    def edges(self) -> EdgeArrays:
+        if self._edges is None:
+            self._edges = EdgeArrays.from_model(self.model)
+            self._index = {asset_id: i for i, asset_id in enumerate(self._edges.asset_ids)}
+        return self._edges
+
+    def _matrix(self, data: np.ndarray, mask: Optional[np.ndarray] = None):
+        edges = self.edges
+        if mask is None:
+            mask = np.ones(edges.num_edges, dtype=bool)
+        size = edges.num_assets
+        # Zeros explícitos são mantidos como arestas de custo zero pelo csgraph
+        return sparse.csr_matrix((data[mask], (edges.source[mask], edges.target[mask])), shape=(size, size))
+
+    def _path(self, predecessors: np.ndarray, target: int) -> List[str]:
+        asset_ids = self.edges.asset_ids
+        path = []
+        current = target
+        while current >= 0:
+            path.insert(0, asset_ids[current])
+            current = predecessors[current]
+        return path
+
+    def shortest_route(self, asset_a: str, asset_b: str, amount: float) -> Tuple[Optional[List[str]], float]:
+        edges = self.edges
+        costs = edge_costs(edges, amount, edges.liquidity)
+        graph = self._matrix(costs, np.isfinite(costs))
+        source, target = self._index[asset_a], self._index[asset_b]
+
+        dist, predecessors = csgraph.dijkstra(graph, indices=source, return_predecessors=True)
+        if not np.isfinite(dist[target]):
+            return None, float('inf')
+        return self._path(predecessors, target), float(dist[target])
+
+    def reachable(self, asset_id: str, max_hops: Optional[int] = None) -> List[str]:
+        asset_ids = self.edges.asset_ids
+        if self._adjacency is None:
+            self._adjacency = self._matrix(np.ones(self.edges.num_edges))
+        source = self._index[asset_id]
+
+        if max_hops is None:
+            order = csgraph.breadth_first_order(self._adjacency, source, directed=True,
+                                                return_predecessors=False)
+        else:
+            hops = csgraph.dijkstra(self._adjacency, indices=source, unweighted=True, limit=max_hops)
+            order = np.flatnonzero(np.isfinite(hops))
+            order = order[np.argsort(hops[order], kind='stable')]
+        return [asset_ids[i] for i in order]
+
+    def widest_path(self, asset_a: str, asset_b: str) -> float:
+        # As pools têm a mesma liquidez nas duas direções, então o caminho de
+        # maior gargalo está na árvore geradora máxima do grafo
+        if self._spanning_tree is None:
+            edges = self.edges
+            tree = csgraph.minimum_spanning_tree(self._matrix(-edges.liquidity))
+            self._spanning_tree = -(tree + tree.T)
+        source, target = self._index[asset_a], self._index[asset_b]
+        if source == target:
+            return float('inf')
+
+        order, predecessors = csgraph.breadth_first_order(self._spanning_tree, source, directed=False)
+        if predecessors[target] < 0:
+            return 0.0
+        width = float('inf')
+        current = target
+        while current != source:
+            previous = predecessors[current]
+            width = min(width, self._spanning_tree[previous, current])
+            current = previous
+        return width
+
+    def components(self) -> List[Set[str]]:
+        asset_ids = self.edges.asset_ids
+        if self._adjacency is None:
+            self._adjacency = self._matrix(np.ones(self.edges.num_edges))
+        count, labels = csgraph.connected_components(self._adjacency, directed=True, connection='weak')
+        components = [set() for _ in range(count)]
+        for asset_id, label in zip(asset_ids, labels):
+            components[label].add(asset_id)
+        return components
+
+
+BACKENDS = {
+    ReferenceBackend.name: ReferenceBackend,
+    CSGraphBackend.name: CSGraphBackend,
+}
+
+
+def create_backend(backend, model) -> GraphBackend:
+    """
+    Cria o backend de grafo de um modelo.
+
+    Args:
+        backend: Nome do backend ('reference' ou 'csgraph'), subclasse ou instância de GraphBackend
+        model: Instância de VectorialEconomicModel
+
+    Returns:
+        GraphBackend: Backend associado ao modelo
+    """
+    if isinstance(backend, type) and issubclass(backend, GraphBackend):
+        return backend(model)
+    if isinstance(backend, GraphBackend):
+        if backend.model is not None and backend.model is not model:
+            raise ValueError("Backend já associado a outro modelo")
+        # Associa a instância ao modelo e descarta estruturas de outro grafo
+        backend.model = model
+        backend.invalidate()
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend {backend} não suportado")
+    return BACKENDS[backend](model)
@@ -0,0 +1,247 @@
+import numpy as np
+from typing import List, Tuple
+from dataclasses import dataclass
+
+from src.models.slippage import slippage_array, slippage_code
+
+
+@dataclass
+class EdgeArrays:
+    """
+    Representação em arrays das arestas do grafo de liquidez.
+
+    As arestas são ordenadas pelo ativo de destino, o que permite reduzir
+    custos de todas as arestas que chegam a um mesmo ativo com `reduceat`.
+    """
+    asset_ids: List[str]
+    source: np.ndarray
+    target: np.ndarray
+    liquidity: np.ndarray
+    swap_fee: np.ndarray
+    slippage_model: np.ndarray
+    reverse: np.ndarray
+
+    @classmethod
+    def from_model(cls, model) -> 'EdgeArrays':
+        """
+        Extrai as arestas do grafo de liquidez de um modelo.
+
+        Args:
+            model: Instância de VectorialEconomicModel
+
+        Returns:
+            EdgeArrays: Arestas do modelo ordenadas pelo destino
+        """
+        asset_ids = list(model.assets)
+        index = {asset_id: i for i, asset_id in enumerate(asset_ids)}
+        edges = sorted(model.liquidity_graph.edges(data=True), key=lambda e: (index[e[1]], index[e[0]]))
+
+        source = np.array([index[u] for u, _, _ in edges], dtype=np.int64)
+        target = np.array([index[v] for _, v, _ in edges], dtype=np.int64)
+        position = {(u, v): i for i, (u, v) in enumerate(zip(source.tolist(), target.tolist()))}
+
+        return cls(
+            asset_ids=asset_ids,
+            source=source,
+            target=target,
+            liquidity=np.array([data['weight'] for _, _, data in edges], dtype=float),
+            swap_fee=np.array([data['swap_fee'] for _, _, data in edges], dtype=float),
+            slippage_model=np.array([slippage_code(data['slippage_model']) for _, _, data in edges],
+                                    dtype=np.int8),
+            reverse=np.array([position.get((v, u), -1) for u, v in position], dtype=np.int64)
+        )
+
+    @property
+    def num_assets(self) -> int:
+        return len(self.asset_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.source)
+
+    def edge_index(self, asset_a: int, asset_b: int) -> int:
+        """
+        Retorna a posição da aresta asset_a -> asset_b, ou -1 se não existir.
+        """
+        candidates = np.flatnonzero((self.source == asset_a) & (self.target == asset_b))
+        return int(candidates[0]) if len(candidates) else -1
+
+    def target_segments(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna os ativos com arestas de entrada e o início de cada segmento.
+        """
+        targets, starts = np.unique(self.target, return_index=True)
+        return targets, starts
+
+
+def slippage(edges: EdgeArrays, amounts: np.ndarray, liquidity: np.ndarray) -> np.ndarray:
+    """
+    Versão vetorizada de `calculate_slippage` para todas as arestas.
+
+    Args:
+        edges: Arestas do grafo
+        amounts: Quantidades trocadas, com broadcast contra `liquidity`
+        liquidity: Liquidez das arestas (..., n_arestas)
+
+    Returns:
+        np.ndarray: Slippage de cada aresta
+    """
+    return slippage_array(edges.slippage_model, amounts, liquidity)
+
+
+def edge_costs(edges: EdgeArrays, amounts: np.ndarray, liquidity: np.ndarray) -> np.ndarray:
+    """
+    Calcula o custo (taxa + slippage) de cada aresta, como em `find_best_swap_route`.
+
+    Arestas com liquidez menor que a quantidade têm custo infinito.
+
+    Args:
+        edges: Arestas do grafo
+        amounts: Quantidades trocadas, com broadcast contra `liquidity`
+        liquidity: Liquidez das arestas (..., n_arestas)
+
+    Returns:
+        np.ndarray: Custo de cada aresta
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        costs = edges.swap_fee + slippage(edges, amounts, liquidity)
+    return np.where(amounts <= liquidity, costs, np.inf)
+
+
+def shortest_paths(edges: EdgeArrays, sources: np.ndarray, costs: np.ndarray,
+                   max_hops: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula caminhos de menor custo para vários problemas de uma vez.
+
+    Usa relaxações de Bellman-Ford vetorizadas sobre o lote: cada linha de
+    `costs` é um grafo com os custos das arestas e cada entrada de `sources`
+    é a origem da linha correspondente.
+
+    Sem limite de hops as relaxações convergem e os predecessores formam uma
+    única árvore de caminhos mínimos. Com `max_hops` o caminho de até k hops
+    de um ativo pode não passar pelo caminho guardado para os ativos
+    intermediários, então é mantido um nível de predecessores por relaxação;
+    os caminhos devem ser percorridos com `walk_paths`.
+
+    Args:
+        edges: Arestas do grafo
+        sources: Ativo de origem de cada problema (n_problemas,)
+        costs: Custos das arestas (n_problemas, n_arestas)
+        max_hops: Número máximo de hops (padrão: sem limite)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Custos mínimos (n_problemas, n_ativos) e as
+        arestas predecessoras (n_problemas, n_níveis, n_ativos), -1 se não houver
+    """
+    batch = len(sources)
+    rows = np.arange(batch)
+    dist = np.full((batch, edges.num_assets), np.inf)
+    dist[rows, sources] = 0.0
+    pred = np.full((batch, edges.num_assets), -1, dtype=np.int64)
+
+    if edges.num_edges == 0:
+        return dist, pred[:, None]
+
+    targets, starts = edges.target_segments()
+    counts = np.diff(np.append(starts, edges.num_edges))
+    edge_positions = np.broadcast_to(np.arange(edges.num_edges), costs.shape)
+
+    hop_limited = max_hops is not None
+    if max_hops is None:
+        max_hops = edges.num_assets - 1
+
+    levels = []
+    for _ in range(max_hops):
+        candidates = dist[:, edges.source] + costs
+        best = np.minimum.reduceat(candidates, starts, axis=1)
+        improved = best < dist[:, targets]
+        if not improved.any():
+            break
+
+        is_best = candidates == np.repeat(best, counts, axis=1)
+        best_edge = np.minimum.reduceat(np.where(is_best, edge_positions, edges.num_edges), starts, axis=1)
+
+        dist[:, targets] = np.where(improved, best, dist[:, targets])
+        pred[:, targets] = np.where(improved, best_edge, pred[:, targets])
+        if hop_limited:
+            levels.append(pred.copy())
+
+    if not levels:
+        return dist, pred[:, None]
+    return dist, np.stack(levels, axis=1)
+
+
+def walk_paths(edges: EdgeArrays, pred: np.ndarray, targets: np.ndarray):
+    """
+    Percorre os caminhos de predecessores do destino até a origem.
+
+    O k-ésimo passo usa o nível de predecessores da relaxação correspondente,
+    de modo que o caminho percorrido é o mesmo que produziu o custo em `dist`.
+
+    Args:
+        edges: Arestas do grafo
+        pred: Arestas predecessoras (n_problemas, n_níveis, n_ativos) de `shortest_paths`
+        targets: Ativo de destino de cada problema (n_problemas,)
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: Problemas que ainda têm hop e a aresta do
+        hop de cada problema (válida só onde ativo)
+    """
+    rows = np.arange(len(targets))
+    num_levels = pred.shape[1]
+    current = np.asarray(targets).copy()
+    for step in range(edges.num_assets):
+        edge = pred[rows, max(num_levels - 1 - step, 0), current]
+        active = edge >= 0
+        if not active.any():
+            break
+        safe_edge = np.where(active, edge, 0)
+        yield active, safe_edge
+        current = np.where(active, edges.source[safe_edge], current)
+
+
+def path_reduce(edges: EdgeArrays, pred: np.ndarray, targets: np.ndarray,
+                values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Percorre os caminhos de predecessores acumulando valores das arestas.
+
+    Args:
+        edges: Arestas do grafo
+        pred: Arestas predecessoras (n_problemas, n_níveis, n_ativos) de `shortest_paths`
+        targets: Ativo de destino de cada problema (n_problemas,)
+        values: Valores por aresta (n_problemas, n_arestas)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Soma, mínimo e número de hops por caminho
+    """
+    batch = len(targets)
+    rows = np.arange(batch)
+    total = np.zeros(batch)
+    minimum = np.full(batch, np.inf)
+    hops = np.zeros(batch, dtype=np.int64)
+
+    for active, edge in walk_paths(edges, pred, targets):
+        edge_values = values[rows, edge]
+        total += np.where(active, edge_values, 0.0)
+        minimum = np.where(active, np.minimum(minimum, edge_values), minimum)
+        hops += active
+
+    return total, minimum, hops
+
+
+def extract_path(edges: EdgeArrays, pred_row: np.ndarray, target: int) -> List[int]:
+    """
+    Reconstrói o caminho até `target` a partir dos predecessores de um problema.
+
+    Args:
+        edges: Arestas do grafo
+        pred_row: Arestas predecessoras (n_níveis, n_ativos) de um problema
+        target: Ativo de destino
+
+    Returns:
+        List[int]: Índices dos ativos no caminho, da origem ao destino
+    """
+    path = [int(target)]
+    for _, edge in walk_paths(edges, pred_row[None], np.array([target])):
+        path.insert(0, int(edges.source[edge[0]]))
+    return path
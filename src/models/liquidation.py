@@ -0,0 +1,334 @@
+import itertools
+import numpy as np
+from typing import Dict, List, Optional, Union
+from dataclasses import dataclass
+
+from src.models.batched_routing import EdgeArrays, edge_costs, shortest_paths, walk_paths
+
+
+@dataclass
+class LiquidationResult:
+    """Resultado da liquidação de várias carteiras em um ativo alvo."""
+    asset_ids: List[str]
+    target: str
+    gross_values: np.ndarray
+    values: np.ndarray
+    costs: np.ndarray
+    order: np.ndarray
+    unfilled: np.ndarray
+
+    @property
+    def total_costs(self) -> np.ndarray:
+        """
+        Retorna a perda de valor de cada carteira com a liquidação (n_carteiras,).
+        """
+        return self.gross_values - self.values
+
+
+class LiquidationEngine:
+    """
+    Estimador do custo de liquidar carteiras inteiras em um ativo alvo.
+
+    Cada carteira é liquidada sobre a sua própria cópia da liquidez das pools:
+    as posições são vendidas em sequência, e a quantidade vendida é retirada
+    da liquidez de todas as pools da rota (nas duas direções). Assim as vendas
+    seguintes enxergam as pools já consumidas e o custo total depende da ordem
+    de venda.
+
+    A ordem é escolhida para minimizar a perda de valor da carteira. Carteiras
+    com até `exhaustive_limit` posições têm todas as ordens avaliadas, e o
+    resultado é exato. Nas maiores a ordem é heurística, sem garantia de ótimo:
+    duas vendas gulosas (pela maior perda ponderada pelo valor da posição e
+    pelo menor custo relativo da rota) são refinadas por busca local com
+    trocas de vendas adjacentes, e a de menor perda é mantida. As
+    simulações são vetorizadas sobre todas as carteiras do bloco, e carteiras
+    idênticas são liquidadas uma única vez.
+    """
+
+    def __init__(self, model, max_chunk_elements: int = 2_000_000, max_hops: Optional[int] = None,
+                 exhaustive_limit: int = 5, local_search_passes: int = 2):
+        """
+        Inicializa o estimador.
+
+        Args:
+            model: Instância de VectorialEconomicModel
+            max_chunk_elements: Máximo de elementos (carteiras x ativos x arestas) por bloco
+            max_hops: Número máximo de hops das rotas (padrão: sem limite)
+            exhaustive_limit: Máximo de posições para avaliar todas as ordens de venda
+            local_search_passes: Passadas da busca local nas carteiras maiores
+        """
+        self.model = model
+        self.max_chunk_elements = max_chunk_elements
+        self.max_hops = max_hops
+        self.exhaustive_limit = exhaustive_limit
+        self.local_search_passes = local_search_passes
+
+        self.edges = EdgeArrays.from_model(model)
+        self.asset_ids = self.edges.asset_ids
+        self.asset_index = {asset_id: i for i, asset_id in enumerate(self.asset_ids)}
+        self.scores = model.get_asset_values(self.asset_ids)
+
+    def _route(self, holdings: np.ndarray, liquidity: np.ndarray, rows: np.ndarray,
+               assets: np.ndarray, target: int):
+        # Rotas mais baratas das posições (rows, assets) sobre a liquidez de cada carteira
+        edge_cost = edge_costs(self.edges, holdings[rows, assets][:, None], liquidity[rows])
+        dist, pred = shortest_paths(self.edges, assets, edge_cost, self.max_hops)
+        return dist[:, target], pred
+
+    def _deplete(self, liquidity: np.ndarray, pred: np.ndarray, rows: np.ndarray,
+                 amount: np.ndarray, target: int):
+        # Retira as quantidades vendidas das pools ao longo das rotas, nas duas direções
+        edges = self.edges
+        for active, edge in walk_paths(edges, pred, np.full(len(rows), target)):
+            hop_rows, hop_edges, hop_amount = rows[active], edge[active], amount[active]
+            liquidity[hop_rows, hop_edges] -= hop_amount
+            paired = edges.reverse[hop_edges] >= 0
+            liquidity[hop_rows[paired], edges.reverse[hop_edges[paired]]] -= hop_amount[paired]
+        np.maximum(liquidity, 0.0, out=liquidity)
+
+    def _losses(self, holdings: np.ndarray, costs: np.ndarray) -> np.ndarray:
+        # Perda de valor de cada carteira; posições não vendidas perdem todo o valor
+        return (holdings * self.scores * np.minimum(costs, 1.0)).sum(axis=1)
+
+    def _simulate_order(self, holdings: np.ndarray, orders: np.ndarray, target: int,
+                        liquidity: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Simula a venda das posições de cada carteira em uma ordem fixa.
+
+        Args:
+            holdings: Matriz (n_carteiras, n_ativos) de quantidades
+            orders: Matriz (n_carteiras, n_passos) com o índice do ativo vendido em
+                cada passo, ou -1 para não vender
+            target: Índice do ativo alvo
+            liquidity: Liquidez (n_carteiras, n_arestas) de partida, atualizada no
+                lugar (padrão: cópia da liquidez atual das pools)
+
+        Returns:
+            np.ndarray: Custo relativo das posições vendidas (inf se não houver rota)
+        """
+        if liquidity is None:
+            liquidity = np.tile(self.edges.liquidity, (len(holdings), 1))
+        costs = np.full(holdings.shape, np.inf)
+
+        for step in range(orders.shape[1]):
+            assets = orders[:, step]
+            rows = np.flatnonzero(assets >= 0)
+            if len(rows) == 0:
+                continue
+            assets = assets[rows]
+            route_cost, pred = self._route(holdings, liquidity, rows, assets, target)
+            costs[rows, assets] = route_cost
+
+            sold = np.isfinite(route_cost)
+            if sold.any():
+                self._deplete(liquidity, pred[sold], rows[sold], holdings[rows[sold], assets[sold]], target)
+
+        return costs
+
+    def _chunked(self, function, holdings: np.ndarray, *arrays):
+        # Aplica `function` em blocos de carteiras para limitar a memória
+        per_portfolio = max(1, self.edges.num_assets * max(self.edges.num_edges, 1))
+        chunk = max(1, self.max_chunk_elements // per_portfolio)
+        results = [
+            function(holdings[start:start + chunk], *(array[start:start + chunk] for array in arrays))
+            for start in range(0, len(holdings), chunk)
+        ]
+        return np.concatenate(results) if results else np.empty((0,) + holdings.shape[1:])
+
+    def _greedy_order(self, holdings: np.ndarray, target: int, weighted: bool) -> np.ndarray:
+        # A cada passo vende a posição com a maior perda ponderada pelo valor
+        # (valor x custo da rota), dando às posições mais caras as pools intactas,
+        # ou, sem ponderação, a posição com a rota de menor custo relativo
+        num_portfolios, num_assets = holdings.shape
+        liquidity = np.tile(self.edges.liquidity, (num_portfolios, 1))
+        remaining = holdings > 0
+        remaining[:, target] = False
+        unit_values = holdings * self.scores
+        orders = np.full(holdings.shape, -1, dtype=np.int64)
+        all_rows = np.arange(num_portfolios)
+
+        for step in range(num_assets):
+            if not remaining.any():
+                break
+            rows, assets = np.nonzero(remaining)
+            route_cost, pred = self._route(holdings, liquidity, rows, assets, target)
+            loss = np.full(holdings.shape, -np.inf)
+            if weighted:
+                loss[rows, assets] = unit_values[rows, assets] * np.minimum(route_cost, 1.0)
+            else:
+                loss[rows, assets] = -route_cost
+
+            # Posições sem rota não consomem liquidez e ficam para o fim
+            loss[rows[~np.isfinite(route_cost)], assets[~np.isfinite(route_cost)]] = -np.inf
+            chosen = np.argmax(np.where(remaining, loss, -np.inf), axis=1)
+            active = remaining[all_rows, chosen] & np.isfinite(loss[all_rows, chosen])
+            if not active.any():
+                break
+
+            orders[active, step] = chosen[active]
+            remaining[all_rows[active], chosen[active]] = False
+            problem_of = np.full(holdings.shape, -1, dtype=np.int64)
+            problem_of[rows, assets] = np.arange(len(rows))
+            selected = problem_of[all_rows[active], chosen[active]]
+            self._deplete(liquidity, pred[selected], all_rows[active],
+                          holdings[all_rows[active], chosen[active]], target)
+
+        # Posições restantes (sem rota) são acrescentadas ao fim da ordem
+        for row, asset in zip(*np.nonzero(remaining)):
+            orders[row, np.argmax(orders[row] < 0)] = asset
+        return orders
+
+    def _local_search(self, holdings: np.ndarray, orders: np.ndarray, target: int):
+        # Refina as ordens trocando vendas adjacentes enquanto a perda diminuir.
+        # Cada passada avança a liquidez do prefixo comum, então uma troca no
+        # passo k só resimula as vendas a partir de k.
+        costs = self._simulate_order(holdings, orders, target)
+        losses = self._losses(holdings, costs)
+        lengths = (orders >= 0).sum(axis=1)
+
+        for _ in range(self.local_search_passes):
+            improved = False
+            liquidity = np.tile(self.edges.liquidity, (len(holdings), 1))
+            prefix_costs = np.full(holdings.shape, np.inf)
+            for step in range(orders.shape[1] - 1):
+                rows = np.flatnonzero(lengths > step + 1)
+                if len(rows) == 0:
+                    break
+                candidate = orders[rows, step:].copy()
+                candidate[:, [0, 1]] = candidate[:, [1, 0]]
+                suffix_costs = self._simulate_order(holdings[rows], candidate, target, liquidity[rows])
+                candidate_costs = np.where(np.isfinite(prefix_costs[rows]), prefix_costs[rows], suffix_costs)
+                candidate_losses = self._losses(holdings[rows], candidate_costs)
+
+                better = candidate_losses < losses[rows] - 1e-12 * np.maximum(np.abs(losses[rows]), 1.0)
+                if better.any():
+                    improved = True
+                    accepted = rows[better]
+                    orders[accepted, step:] = candidate[better]
+                    costs[accepted] = candidate_costs[better]
+                    losses[accepted] = candidate_losses[better]
+
+                # Avança o prefixo com a venda (possivelmente trocada) do passo
+                step_costs = self._simulate_order(holdings, orders[:, step:step + 1], target, liquidity)
+                prefix_costs = np.where(np.isfinite(step_costs), step_costs, prefix_costs)
+            if not improved:
+                break
+
+        return costs, orders
+
+    def _exhaustive(self, holdings: np.ndarray, positions: List[np.ndarray], target: int):
+        # Avalia todas as ordens de venda e mantém a de menor perda
+        width = max((len(held) for held in positions), default=0)
+        owners, candidates = [], []
+        for row, held in enumerate(positions):
+            for permutation in itertools.permutations(held):
+                owners.append(row)
+                candidates.append(list(permutation) + [-1] * (width - len(held)))
+        owners = np.asarray(owners, dtype=np.int64)
+        candidates = np.asarray(candidates, dtype=np.int64).reshape(len(owners), width)
+
+        candidate_holdings = holdings[owners]
+        costs = self._chunked(
+            lambda chunk, chunk_orders: self._simulate_order(chunk, chunk_orders, target),
+            candidate_holdings, candidates
+        )
+        losses = self._losses(candidate_holdings, costs)
+
+        # Primeira ordem de menor perda de cada carteira (owners é crescente)
+        ranking = np.lexsort((np.arange(len(owners)), losses, owners))
+        starts = np.searchsorted(owners[ranking], np.arange(len(holdings)))
+        best = ranking[starts]
+        return costs[best], candidates[best]
+
+    def _liquidate_chunk(self, holdings: np.ndarray, target: int):
+        num_portfolios, num_assets = holdings.shape
+        costs = np.full(holdings.shape, np.inf)
+        order = np.full(holdings.shape, -1, dtype=np.int64)
+
+        held = holdings > 0
+        held[:, target] = False
+        positions = [np.flatnonzero(row) for row in held]
+        small = np.array([len(row) <= self.exhaustive_limit for row in positions], dtype=bool)
+        small &= held.any(axis=1)
+
+        if small.any():
+            rows = np.flatnonzero(small)
+            best_costs, best_orders = self._exhaustive(holdings[rows], [positions[row] for row in rows], target)
+            costs[rows] = best_costs
+            steps = np.broadcast_to(np.arange(best_orders.shape[1]), best_orders.shape)
+            valid = best_orders >= 0
+            order[np.repeat(rows, valid.sum(axis=1)), best_orders[valid]] = steps[valid]
+
+        large = ~small & held.any(axis=1)
+        if large.any():
+            rows = np.flatnonzero(large)
+            best_costs, best_orders, best_losses = None, None, None
+            for weighted in (True, False):
+                orders = self._greedy_order(holdings[rows], target, weighted)
+                search_costs, search_orders = self._local_search(holdings[rows], orders, target)
+                search_losses = self._losses(holdings[rows], search_costs)
+                if best_costs is None:
+                    best_costs, best_orders, best_losses = search_costs, search_orders, search_losses
+                    continue
+                better = search_losses < best_losses
+                best_costs[better] = search_costs[better]
+                best_orders[better] = search_orders[better]
+                best_losses[better] = search_losses[better]
+            costs[rows] = best_costs
+            steps = np.broadcast_to(np.arange(num_assets), best_orders.shape)
+            valid = best_orders >= 0
+            order[np.repeat(rows, valid.sum(axis=1)), best_orders[valid]] = steps[valid]
+
+        # Posições sem rota até o alvo não entram na ordem de venda
+        order = np.where(np.isfinite(costs), order, -1)
+        return costs, order
+
+    def liquidate(self, portfolios: Union[np.ndarray, List[Dict[str, float]]],
+                  target: str) -> LiquidationResult:
+        """
+        Estima os valores ajustados pela liquidação de várias carteiras.
+
+        Args:
+            portfolios: Carteiras, como matriz (n_carteiras, n_ativos) ou lista de dicionários
+            target: Ativo numerário no qual as carteiras são liquidadas
+
+        Returns:
+            LiquidationResult: Valores brutos e líquidos, custo e ordem de venda de cada posição
+        """
+        if target not in self.asset_index:
+            raise ValueError("Ativo não encontrado no modelo")
+
+        matrix = self.model.get_portfolio_matrix(portfolios, self.asset_ids)
+        # Valores unitários atuais dos ativos (o modelo mantém a matriz em cache)
+        self.scores = self.model.get_asset_values(self.asset_ids)
+        target_index = self.asset_index[target]
+
+        # Carteiras idênticas compartilham a mesma simulação
+        unique, inverse = np.unique(matrix, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        costs = np.full(unique.shape, np.inf)
+        order = np.full(unique.shape, -1, dtype=np.int64)
+        per_portfolio = max(1, len(self.asset_ids) * max(self.edges.num_edges, 1))
+        chunk = max(1, self.max_chunk_elements // per_portfolio)
+        for start in range(0, len(unique), chunk):
+            end = min(start + chunk, len(unique))
+            costs[start:end], order[start:end] = self._liquidate_chunk(unique[start:end], target_index)
+
+        costs[:, target_index] = 0.0
+        costs = np.where(unique > 0, costs, 0.0)
+        unfilled = (unique > 0) & ~np.isfinite(costs)
+
+        unit_values = unique * self.scores
+        retained = np.where(unfilled, 0.0, np.clip(1.0 - costs, 0.0, None))
+        values = (unit_values * retained).sum(axis=1)
+
+        return LiquidationResult(
+            asset_ids=list(self.asset_ids),
+            target=target,
+            gross_values=unit_values.sum(axis=1)[inverse],
+            values=values[inverse],
+            costs=costs[inverse],
+            order=order[inverse],
+            unfilled=unfilled[inverse]
+        )
@@ -0,0 +1,462 @@
+import heapq
+import multiprocessing
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import networkx as nx
+from networkx.algorithms.community import greedy_modularity_communities
+
+from src.models.backends import widest_paths
+from src.models.routes import RouteSet, SwapRoute
+from src.models.slippage import edge_cost, path_effective_rate
+
+
+def partition_assets(model, method: str = 'community', attribute: str = 'chain',
+                     num_shards: Optional[int] = None) -> Dict[str, int]:
+    """
+    Divide os ativos de um modelo em shards.
+
+    As comunidades (ou grupos de mesmo atributo) são distribuídas em no
+    máximo `num_shards` shards: cada grupo, do maior para o menor, vai para o
+    shard com menos ativos até o momento. Grupos pequenos, como ativos
+    isolados, são assim agrupados em vez de virarem shards (e processos)
+    próprios.
+
+    Args:
+        model: Instância de VectorialEconomicModel
+        method: 'community' (comunidades de modularidade do grafo) ou 'attribute'
+        attribute: Atributo dos ativos usado quando method='attribute' (ex.: 'chain')
+        num_shards: Número máximo de shards (padrão: número de CPUs)
+
+    Returns:
+        Dict[str, int]: Shard de cada ativo
+    """
+    if method == 'community':
+        groups = [list(community) for community in
+                  greedy_modularity_communities(model.liquidity_graph.to_undirected(), weight='weight')]
+    elif method == 'attribute':
+        labels = {}
+        for asset_id, info in model.assets.items():
+            labels.setdefault(info.get(attribute), []).append(asset_id)
+        groups = list(labels.values())
+    else:
+        raise ValueError(f"Método de particionamento {method} não suportado")
+
+    if num_shards is None:
+        num_shards = os.cpu_count() or 1
+    if num_shards <= 0:
+        raise ValueError("num_shards deve ser positivo")
+    num_shards = min(num_shards, len(groups))
+
+    # Distribui os grupos do maior para o menor no shard menos ocupado
+    bins = [(0, shard) for shard in range(num_shards)]
+    partition = {}
+    for group in sorted(groups, key=len, reverse=True):
+        size, shard = heapq.heappop(bins)
+        for asset_id in group:
+            partition[asset_id] = shard
+        heapq.heappush(bins, (size + len(group), shard))
+    return partition
+
+
+class GraphShard:
+    """
+    Fatia do grafo de liquidez mantida por um worker.
+
+    Guarda as arestas internas do shard e calcula, sob demanda e com cache
+    LRU por quantidade, as tabelas de custo entre os seus ativos de fronteira
+    (ativos com pools para outros shards).
+    """
+
+    def __init__(self, shard_id: int, graph: nx.DiGraph, boundary: Sequence[str],
+                 precompute_amounts: Sequence[float] = (), max_tables: int = 64):
+        """
+        Args:
+            shard_id: Identificador do shard
+            graph: Subgrafo com os ativos e as arestas internas do shard
+            boundary: Ativos de fronteira do shard
+            precompute_amounts: Quantidades cujas tabelas de fronteira são calculadas na criação
+            max_tables: Número máximo de tabelas de custo mantidas em cache
+        """
+        self.shard_id = shard_id
+        self.graph = graph
+        self.boundary = list(boundary)
+        self.max_tables = max_tables
+        self.cost_tables = OrderedDict()
+        self.width_table = None
+        for amount in precompute_amounts:
+            self.boundary_costs(amount)
+
+    def _dijkstra(self, source: str, amount: float, reverse: bool = False):
+        graph = self.graph.reverse(copy=False) if reverse else self.graph
+        return nx.single_source_dijkstra(graph, source, weight=lambda u, v, data: edge_cost(data, amount))
+
+    def costs_from(self, source: str, amount: float) -> Dict[str, float]:
+        """
+        Custos mínimos de `source` até os ativos do shard.
+        """
+        costs, _ = self._dijkstra(source, amount)
+        return costs
+
+    def costs_to(self, target: str, amount: float) -> Dict[str, float]:
+        """
+        Custos mínimos dos ativos do shard até `target`.
+        """
+        costs, _ = self._dijkstra(target, amount, reverse=True)
+        return costs
+
+    def boundary_costs(self, amount: float) -> Dict[Tuple[str, str], float]:
+        """
+        Tabela de custos mínimos entre pares de ativos de fronteira.
+        """
+        if amount in self.cost_tables:
+            self.cost_tables.move_to_end(amount)
+            return self.cost_tables[amount]
+
+        table = {}
+        for u in self.boundary:
+            costs = self.costs_from(u, amount)
+            for v in self.boundary:
+                if v != u and v in costs:
+                    table[(u, v)] = costs[v]
+        self.cost_tables[amount] = table
+        if len(self.cost_tables) > self.max_tables:
+            self.cost_tables.popitem(last=False)
+        return table
+
+    def local_path(self, source: str, target: str, amount: float) -> Optional[List[str]]:
+        """
+        Caminho de menor custo entre dois ativos do shard.
+        """
+        _, paths = self._dijkstra(source, amount)
+        return paths.get(target)
+
+    def _widest(self, source: str, reverse: bool = False) -> Dict[str, float]:
+        graph = self.graph.reverse(copy=False) if reverse else self.graph
+        return widest_paths(lambda node: ((v, data['weight']) for _, v, data in graph.out_edges(node, data=True)),
+                            source)
+
+    def widths_from(self, source: str) -> Dict[str, float]:
+        """
+        Maior liquidez de gargalo de `source` até os ativos do shard.
+        """
+        return self._widest(source)
+
+    def widths_to(self, target: str) -> Dict[str, float]:
+        """
+        Maior liquidez de gargalo dos ativos do shard até `target`.
+        """
+        return self._widest(target, reverse=True)
+
+    def boundary_widths(self) -> Dict[Tuple[str, str], float]:
+        """
+        Tabela de liquidez de gargalo entre pares de ativos de fronteira.
+        """
+        if self.width_table is None:
+            table = {}
+            for u in self.boundary:
+                widths = self.widths_from(u)
+                for v in self.boundary:
+                    if v != u and v in widths:
+                        table[(u, v)] = widths[v]
+            self.width_table = table
+        return self.width_table
+
+    def direct_edge(self, source: str, target: str) -> Optional[Dict]:
+        """
+        Atributos da aresta interna entre dois ativos, ou None se não existir.
+        """
+        data = self.graph.get_edge_data(source, target)
+        return None if data is None else dict(data)
+
+    def edge_data(self, path: Sequence[str]) -> List[Dict]:
+        """
+        Atributos das arestas internas de um caminho.
+        """
+        return [dict(self.graph[u][v]) for u, v in zip(path[:-1], path[1:])]
+
+
+def _serve_shard(conn, shard: GraphShard):
+    # Laço do processo worker: executa métodos do shard até receber None
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        name, args = message
+        try:
+            conn.send((True, getattr(shard, name)(*args)))
+        except Exception as e:
+            conn.send((False, e))
+    conn.close()
+
+
+class LocalShardClient:
+    """Cliente de um shard executado no próprio processo."""
+
+    def __init__(self, shard: GraphShard):
+        self.shard = shard
+        self._pending = []
+
+    def send(self, name: str, *args):
+        self._pending.append(getattr(self.shard, name)(*args))
+
+    def recv(self):
+        return self._pending.pop(0)
+
+    def call(self, name: str, *args):
+        self.send(name, *args)
+        return self.recv()
+
+    def close(self):
+        pass
+
+
+class ProcessShardClient:
+    """Cliente de um shard executado em um processo separado, fazendo o papel de um nó."""
+
+    def __init__(self, shard: GraphShard, context=None):
+        context = context or multiprocessing.get_context()
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_serve_shard, args=(child_conn, shard), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def send(self, name: str, *args):
+        self._conn.send((name, args))
+
+    def recv(self):
+        ok, result = self._conn.recv()
+        if not ok:
+            raise result
+        return result
+
+    def call(self, name: str, *args):
+        self.send(name, *args)
+        return self.recv()
+
+    def close(self):
+        if self.process.is_alive():
+            self._conn.send(None)
+            self.process.join()
+        self._conn.close()
+
+
+class PartitionedRouter:
+    """
+    Roteamento em dois níveis sobre o grafo de liquidez particionado.
+
+    Cada shard guarda só as suas arestas internas e responde por custos
+    locais e tabelas entre ativos de fronteira. O coordenador guarda apenas
+    o mapa de shards e as arestas entre shards; uma consulta monta um grafo
+    de sobreposição com origem, destino, ativos de fronteira, tabelas dos
+    shards e arestas entre shards, resolve-o e expande cada trecho interno
+    pedindo o caminho local ao shard correspondente.
+    """
+
+    def __init__(self, model, partition: Optional[Dict[str, int]] = None, processes: bool = True,
+                 precompute_amounts: Sequence[float] = (), context=None,
+                 num_shards: Optional[int] = None, max_tables: int = 64,
+                 max_cached_routes: int = 10_000):
+        """
+        Args:
+            model: Instância de VectorialEconomicModel
+            partition: Shard de cada ativo (padrão: `partition_assets(model, num_shards=num_shards)`)
+            processes: Se True, cada shard roda em um processo separado
+            precompute_amounts: Quantidades cujas tabelas de fronteira são calculadas na criação
+            context: Contexto de multiprocessing (padrão: o do sistema)
+            num_shards: Número máximo de shards, e de processos, da partição padrão
+                (padrão: número de CPUs)
+            max_tables: Número máximo de tabelas de custo em cache por shard
+            max_cached_routes: Número máximo de rotas em cache no coordenador
+        """
+        if partition is None:
+            partition = partition_assets(model, num_shards=num_shards)
+        missing = set(model.assets) - set(partition)
+        if missing:
+            raise ValueError(f"Ativos sem shard: {sorted(missing)}")
+
+        self.partition = dict(partition)
+        self.asset_table = model.asset_table
+        self.max_cached_routes = max_cached_routes
+        self.route_cache = OrderedDict()
+        self.route_store = RouteSet.empty(self.asset_table)
+
+        # Arestas entre shards ficam no coordenador
+        self.cross_edges = nx.DiGraph()
+        shard_graphs = {shard: nx.DiGraph() for shard in set(self.partition.values())}
+        for asset_id, shard in self.partition.items():
+            shard_graphs[shard].add_node(asset_id)
+        for u, v, data in model.liquidity_graph.edges(data=True):
+            if self.partition[u] == self.partition[v]:
+                shard_graphs[self.partition[u]].add_edge(u, v, **data)
+            else:
+                self.cross_edges.add_edge(u, v, **data)
+
+        self.boundary = {shard: sorted(n for n in self.cross_edges if self.partition[n] == shard)
+                         for shard in shard_graphs}
+        self.shards = {}
+        for shard, graph in shard_graphs.items():
+            local = GraphShard(shard, graph, self.boundary[shard], precompute_amounts, max_tables)
+            self.shards[shard] = ProcessShardClient(local, context) if processes else LocalShardClient(local)
+
+    def close(self):
+        """
+        Encerra os processos dos shards.
+        """
+        for client in self.shards.values():
+            client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _cache_route(self, cache_key: str, route: Optional[SwapRoute]) -> Optional[SwapRoute]:
+        # Cache LRU de rotas; quando o armazenamento acumula o dobro do limite,
+        # é compactado só com as rotas ainda em cache
+        self.route_cache[cache_key] = route
+        if len(self.route_cache) > self.max_cached_routes:
+            self.route_cache.popitem(last=False)
+        if len(self.route_store) > 2 * self.max_cached_routes:
+            live = [cached for cached in self.route_cache.values() if cached is not None]
+            self.route_store = self.route_store.compact(live)
+        return route
+
+    def _gather(self, name: str, *args) -> Dict[int, object]:
+        # Dispara a chamada em todos os shards antes de esperar as respostas
+        for client in self.shards.values():
+            client.send(name, *args)
+        return {shard: client.recv() for shard, client in self.shards.items()}
+
+    def _overlay(self, asset_a: str, asset_b: str, source_table: Dict[str, float],
+                 target_table: Dict[str, float], shard_tables: Dict[int, Dict], cross_weight):
+        overlay = nx.DiGraph()
+        shard_a, shard_b = self.partition[asset_a], self.partition[asset_b]
+        for node, value in source_table.items():
+            if node != asset_a and (node in self.boundary[shard_a] or node == asset_b):
+                overlay.add_edge(asset_a, node, weight=value, shard=shard_a)
+        for node, value in target_table.items():
+            if node != asset_b and node in self.boundary[shard_b]:
+                overlay.add_edge(node, asset_b, weight=value, shard=shard_b)
+        for shard, table in shard_tables.items():
+            for (u, v), value in table.items():
+                overlay.add_edge(u, v, weight=value, shard=shard)
+        for u, v, data in self.cross_edges.edges(data=True):
+            value = cross_weight(data)
+            if value is not None:
+                overlay.add_edge(u, v, weight=value, shard=None)
+        return overlay
+
+    def _path_edges(self, path: List[str]) -> List[Dict]:
+        edges = []
+        start = 0
+        for i in range(1, len(path) + 1):
+            # Agrupa trechos consecutivos internos a um mesmo shard
+            if i == len(path) or self.partition[path[i]] != self.partition[path[start]]:
+                if i - start > 1:
+                    edges.extend(self.shards[self.partition[path[start]]].call('edge_data', path[start:i]))
+                if i < len(path):
+                    edges.append(dict(self.cross_edges[path[i - 1]][path[i]]))
+                start = i
+        return edges
+
+    def find_best_swap_route(self, asset_a: str, asset_b: str, amount: float) -> Optional[SwapRoute]:
+        """
+        Encontra a melhor rota de swap entre dois ativos pela busca em dois níveis.
+
+        Args:
+            asset_a: Ativo de origem
+            asset_b: Ativo de destino
+            amount: Quantidade a ser trocada
+
+        Returns:
+            Optional[SwapRoute]: A melhor rota de swap ou None se não existir rota
+        """
+        if asset_a not in self.partition or asset_b not in self.partition:
+            raise ValueError("Ativos não encontrados no modelo")
+
+        cache_key = f"{asset_a}_{asset_b}_{amount}"
+        if cache_key in self.route_cache:
+            self.route_cache.move_to_end(cache_key)
+            return self.route_cache[cache_key]
+
+        # Como no modelo, a rota de um ativo para ele mesmo não tem hops
+        if asset_a == asset_b:
+            return self._cache_route(cache_key, self.route_store.add([asset_a], 0.0, 0.0, float('inf')))
+
+        shard_a, shard_b = self.partition[asset_a], self.partition[asset_b]
+        client_a, client_b = self.shards[shard_a], self.shards[shard_b]
+
+        # Como no modelo, a rota direta tem prioridade quando viável
+        if shard_a == shard_b:
+            direct = client_a.call('direct_edge', asset_a, asset_b)
+        else:
+            direct = self.cross_edges.get_edge_data(asset_a, asset_b)
+        if direct is not None and edge_cost(direct, amount) is not None:
+            cost = edge_cost(direct, amount)
+            return self._cache_route(cache_key, self.route_store.add([asset_a, asset_b], cost, cost,
+                                                                     direct['weight']))
+
+        client_a.send('costs_from', asset_a, amount)
+        client_b.send('costs_to', asset_b, amount)
+        source_table = client_a.recv()
+        target_table = client_b.recv()
+        shard_tables = self._gather('boundary_costs', amount)
+
+        overlay = self._overlay(asset_a, asset_b, source_table, target_table, shard_tables,
+                                lambda data: edge_cost(data, amount))
+        if asset_a not in overlay or asset_b not in overlay:
+            return self._cache_route(cache_key, None)
+        try:
+            total_cost, overlay_path = nx.single_source_dijkstra(overlay, asset_a, asset_b)
+        except nx.NetworkXNoPath:
+            return self._cache_route(cache_key, None)
+
+        # Expande os trechos internos dos shards
+        path = [asset_a]
+        for u, v in zip(overlay_path[:-1], overlay_path[1:]):
+            shard = overlay[u][v]['shard']
+            if shard is None:
+                path.append(v)
+            else:
+                path.extend(self.shards[shard].call('local_path', u, v, amount)[1:])
+
+        edges = self._path_edges(path)
+        route = self.route_store.add(path, total_cost, path_effective_rate(edges, amount),
+                                     min((data['weight'] for data in edges), default=float('inf')))
+        return self._cache_route(cache_key, route)
+
+    def widest_path_liquidity(self, asset_a: str, asset_b: str) -> float:
+        """
+        Liquidez indireta entre dois ativos pela rota de maior gargalo.
+
+        A soma sobre todas as rotas simples de `calculate_indirect_liquidity`
+        não se decompõe entre shards; a liquidez da melhor rota (o maior
+        mínimo de liquidez entre as pools) se decompõe e é usada aqui.
+
+        Args:
+            asset_a: Ativo de origem
+            asset_b: Ativo de destino
+
+        Returns:
+            float: Liquidez de gargalo da melhor rota (0.0 se não houver rota)
+        """
+        if asset_a not in self.partition or asset_b not in self.partition:
+            raise ValueError("Ativos não encontrados no modelo")
+
+        client_a, client_b = self.shards[self.partition[asset_a]], self.shards[self.partition[asset_b]]
+        client_a.send('widths_from', asset_a)
+        client_b.send('widths_to', asset_b)
+        source_table = client_a.recv()
+        target_table = client_b.recv()
+        shard_tables = self._gather('boundary_widths')
+
+        overlay = self._overlay(asset_a, asset_b, source_table, target_table, shard_tables,
+                                lambda data: data['weight'])
+        if asset_a not in overlay:
+            return 0.0
+        widths = widest_paths(lambda node: ((v, data['weight']) for _, v, data in overlay.out_edges(node, data=True)),
+                              asset_a)
+        return widths.get(asset_b, 0.0)
+
@@ -0,0 +1,217 @@
+import numpy as np
+from typing import Dict, List, Optional, Union
+from dataclasses import dataclass
+
+
+@dataclass
+class OptimizationResult:
+    """Resultado de uma otimização em lote de carteiras."""
+    asset_ids: List[str]
+    holdings: np.ndarray
+    values: np.ndarray
+    objective: np.ndarray
+    converged: np.ndarray
+
+    def to_portfolios(self, min_quantity: float = 0.0) -> List[Dict[str, float]]:
+        """
+        Converte a matriz de quantidades em carteiras no formato do modelo.
+
+        Args:
+            min_quantity: Quantidade mínima para incluir um ativo na carteira
+
+        Returns:
+            List[Dict[str, float]]: Uma carteira por linha da matriz
+        """
+        portfolios = []
+        for row in self.holdings:
+            portfolios.append({
+                asset_id: float(quantity)
+                for asset_id, quantity in zip(self.asset_ids, row)
+                if quantity > min_quantity
+            })
+        return portfolios
+
+
+class BatchPortfolioOptimizer:
+    """
+    Otimizador de carteiras em lote sobre o modelo vetorial.
+
+    Para cada carteira atual q0 encontra as quantidades q que maximizam
+
+        Σ sᵢ qᵢ - (λ / 2) Σ sᵢ (qᵢ - q0ᵢ)² / Lᵢ
+
+    onde sᵢ é o valor unitário do ativo (soma do vetor normalizado, como em
+    `calculate_portfolio_value`), Lᵢ é a liquidez total das pools do ativo e o
+    segundo termo é o custo de slippage linear do rebalanceamento. As
+    restrições são o orçamento (Σ qᵢ ≤ B), limites por ativo e um teto de
+    posição proporcional à liquidez das pools.
+    """
+
+    def __init__(self, model, impact_aversion: float = 1.0, liquidity_fraction: float = 0.1,
+                 max_iter: int = 100, tol: float = 1e-10):
+        """
+        Inicializa o otimizador.
+
+        Args:
+            model: Instância de VectorialEconomicModel
+            impact_aversion: Peso λ do custo de slippage do rebalanceamento
+            liquidity_fraction: Fração máxima da liquidez das pools que uma posição pode ocupar
+            max_iter: Número máximo de iterações da bisseção do orçamento
+            tol: Tolerância relativa da restrição de orçamento
+        """
+        if impact_aversion <= 0:
+            raise ValueError("impact_aversion deve ser positivo")
+
+        self.model = model
+        self.impact_aversion = impact_aversion
+        self.liquidity_fraction = liquidity_fraction
+        self.max_iter = max_iter
+        self.tol = tol
+
+        self.asset_ids = list(model.assets)
+        self.pool_liquidity = np.array([
+            sum(data['weight'] for _, _, data in model.liquidity_graph.out_edges(asset_id, data=True))
+            if asset_id in model.liquidity_graph else 0.0
+            for asset_id in self.asset_ids
+        ])
+
+        # Ativos sem pools não podem ser negociados e ficam congelados
+        self.tradable = self.pool_liquidity > 0
+        self.refresh_scores()
+
+    def refresh_scores(self):
+        """
+        Relê do modelo os valores unitários dos ativos e a curvatura do custo
+        de rebalanceamento. Chamado por `optimize` e `portfolio_values`.
+        """
+        self.scores = self.model.get_asset_values(self.asset_ids)
+        self.curvature = np.where(
+            self.tradable,
+            self.impact_aversion * np.abs(self.scores) / np.where(self.tradable, self.pool_liquidity, 1.0),
+            0.0
+        )
+
+    def portfolio_values(self, holdings: np.ndarray) -> np.ndarray:
+        """
+        Calcula o valor de várias carteiras de uma vez.
+
+        Args:
+            holdings: Matriz (n_carteiras, n_ativos) de quantidades
+
+        Returns:
+            np.ndarray: Valores (n_carteiras,), equivalentes a `calculate_portfolio_value`
+        """
+        self.refresh_scores()
+        return holdings @ self.scores
+
+    def objective(self, holdings: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """
+        Avalia a função objetivo para várias carteiras.
+
+        Args:
+            holdings: Matriz (n_carteiras, n_ativos) de quantidades candidatas
+            current: Matriz (n_carteiras, n_ativos) de quantidades atuais
+
+        Returns:
+            np.ndarray: Valor líquido do custo de rebalanceamento (n_carteiras,)
+        """
+        trades = holdings - current
+        return holdings @ self.scores - 0.5 * (trades * trades) @ self.curvature
+
+    def gradient(self, holdings: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """
+        Avalia o gradiente da função objetivo para várias carteiras.
+
+        Args:
+            holdings: Matriz (n_carteiras, n_ativos) de quantidades candidatas
+            current: Matriz (n_carteiras, n_ativos) de quantidades atuais
+
+        Returns:
+            np.ndarray: Gradiente (n_carteiras, n_ativos)
+        """
+        return self.scores - self.curvature * (holdings - current)
+
+    def _bounds(self, current: np.ndarray, lower, upper):
+        lower = np.broadcast_to(np.asarray(0.0 if lower is None else lower, dtype=float), current.shape)
+        upper = np.broadcast_to(np.asarray(np.inf if upper is None else upper, dtype=float), current.shape)
+        upper = np.minimum(upper, self.liquidity_fraction * self.pool_liquidity)
+
+        # Ativos sem pools mantêm a quantidade atual
+        lower = np.where(self.tradable, lower, current)
+        upper = np.where(self.tradable, upper, current)
+        if np.any(lower > upper):
+            raise ValueError("Limite inferior acima do limite superior")
+        return lower, upper
+
+    def _solve(self, tau: np.ndarray, current: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        # Maximizador da lagrangiana para o preço-sombra do orçamento tau
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = (self.scores - tau[:, None]) / self.curvature
+        return np.clip(current + np.where(self.tradable, step, 0.0), lower, upper)
+
+    def optimize(self, portfolios: Union[np.ndarray, List[Dict[str, float]]],
+                 budgets: Optional[np.ndarray] = None,
+                 lower: Optional[np.ndarray] = None,
+                 upper: Optional[np.ndarray] = None) -> OptimizationResult:
+        """
+        Rebalanceia várias carteiras em uma única execução vetorizada.
+
+        O problema é côncavo e separável por ativo, então as condições KKT
+        reduzem cada carteira a uma busca unidimensional pelo preço-sombra do
+        orçamento, feita por bisseção simultânea em todas as carteiras.
+
+        Args:
+            portfolios: Carteiras atuais, como matriz (n_carteiras, n_ativos) ou lista de dicionários
+            budgets: Orçamento de cada carteira (padrão: soma das quantidades atuais)
+            lower: Quantidade mínima por ativo, escalar ou matriz (padrão: 0)
+            upper: Quantidade máxima por ativo, escalar ou matriz (padrão: sem limite)
+
+        Returns:
+            OptimizationResult: Quantidades ótimas, valores e status de convergência
+        """
+        current = self.model.get_portfolio_matrix(portfolios, self.asset_ids)
+        self.refresh_scores()
+
+        if budgets is None:
+            budgets = current.sum(axis=1)
+        budgets = np.broadcast_to(np.asarray(budgets, dtype=float), (len(current),))
+
+        lower, upper = self._bounds(current, lower, upper)
+        if np.any(lower.sum(axis=1) > budgets * (1 + self.tol)):
+            raise ValueError("Orçamento insuficiente para os limites inferiores")
+
+        # Sem restrição de orçamento ativa o preço-sombra é zero
+        tau_low = np.zeros(len(current))
+        holdings = self._solve(tau_low, current, lower, upper)
+        binding = holdings.sum(axis=1) > budgets
+
+        # Com tau_high todas as quantidades negociáveis ficam no limite inferior
+        tau_high = np.max(
+            np.where(self.tradable, self.scores + self.curvature * (current - lower), 0.0),
+            axis=1
+        )
+        tau_high = np.maximum(tau_high, 0.0)
+
+        converged = ~binding
+        for _ in range(self.max_iter):
+            if converged.all():
+                break
+            tau = 0.5 * (tau_low + tau_high)
+            candidate = self._solve(tau, current, lower, upper)
+            excess = candidate.sum(axis=1) - budgets
+            over = binding & (excess > 0)
+            under = binding & (excess <= 0)
+            tau_low = np.where(over, tau, tau_low)
+            tau_high = np.where(under, tau, tau_high)
+            converged = ~binding | (np.abs(excess) <= self.tol * np.maximum(budgets, 1.0))
+
+        # tau_high é sempre viável para o orçamento
+        holdings = np.where(binding[:, None], self._solve(tau_high, current, lower, upper), holdings)
+
+        return OptimizationResult(
+            asset_ids=list(self.asset_ids),
+            holdings=holdings,
+            values=self.portfolio_values(holdings),
+            objective=self.objective(holdings, current),
+            converged=converged
+        )
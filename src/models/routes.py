@@ -0,0 +1,448 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+
+class AssetTable:
+    """
+    Tabela de internação dos ids de ativos em inteiros.
+
+    Os inteiros são atribuídos na ordem de internação e nunca mudam, de modo
+    que rotas codificadas continuam válidas conforme novos ativos entram.
+    """
+    __slots__ = ('asset_ids', 'index')
+
+    def __init__(self, asset_ids: Iterable[str] = ()):
+        self.asset_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        for asset_id in asset_ids:
+            self.intern(asset_id)
+
+    def __len__(self) -> int:
+        return len(self.asset_ids)
+
+    def intern(self, asset_id: str) -> int:
+        """
+        Retorna o inteiro de um ativo, criando-o se necessário.
+        """
+        node_id = self.index.get(asset_id)
+        if node_id is None:
+            node_id = len(self.asset_ids)
+            self.index[asset_id] = node_id
+            self.asset_ids.append(asset_id)
+        return node_id
+
+    def encode(self, path: Sequence[str]) -> np.ndarray:
+        """
+        Codifica um caminho de ids de ativos em um array int32.
+        """
+        return np.array([self.intern(asset_id) for asset_id in path], dtype=np.int32)
+
+    def decode(self, node_ids: Iterable[int]) -> List[str]:
+        """
+        Decodifica um array de inteiros em ids de ativos.
+        """
+        return [self.asset_ids[node_id] for node_id in node_ids]
+
+
+class SwapRoute:
+    """
+    Representa uma rota de swap entre dois ativos.
+
+    A rota é apenas uma referência (conjunto, posição) para um RouteSet: o
+    caminho fica no buffer int32 compartilhado do conjunto e os atributos
+    numéricos nos seus arrays paralelos. O caminho só é decodificado para ids
+    de ativos quando `path` é acessado.
+    """
+    __slots__ = ('_routes', '_index')
+
+    def __init__(self, path: Union[Sequence[str], np.ndarray], total_cost: float,
+                 effective_rate: float, liquidity: float,
+                 balanced_score: Optional[float] = None,
+                 asset_table: Optional['AssetTable'] = None):
+        """
+        Cria uma rota avulsa, guardada em um RouteSet próprio.
+
+        Rotas em grande quantidade devem ser criadas com `RouteSet.add`, que as
+        guarda no buffer compartilhado do conjunto.
+
+        Args:
+            path: Caminho como lista de ids de ativos ou array de inteiros da tabela
+            total_cost: Custo total da rota
+            effective_rate: Taxa efetiva da rota
+            liquidity: Liquidez da rota (mínimo entre as pools)
+            balanced_score: Score balanceado de `analyze_route_efficiency`, se calculado
+            asset_table: Tabela de internação dos ativos (padrão: tabela própria da rota)
+        """
+        routes = RouteSet.empty(asset_table, capacity=1)
+        self._routes = routes
+        self._index = routes.append(path, total_cost, effective_rate, liquidity, balanced_score)
+
+    @classmethod
+    def _bind(cls, routes: 'RouteSet', index: int) -> 'SwapRoute':
+        route = cls.__new__(cls)
+        route._routes = routes
+        route._index = index
+        return route
+
+    @property
+    def asset_table(self) -> AssetTable:
+        return self._routes.asset_table
+
+    @property
+    def node_ids(self) -> np.ndarray:
+        return self._routes.node_ids(self._index)
+
+    @property
+    def path(self) -> List[str]:
+        return self._routes.asset_table.decode(self.node_ids)
+
+    @property
+    def total_cost(self) -> float:
+        return float(self._routes._total_cost[self._index])
+
+    @total_cost.setter
+    def total_cost(self, value: float):
+        self._routes._total_cost[self._index] = value
+
+    @property
+    def effective_rate(self) -> float:
+        return float(self._routes._effective_rate[self._index])
+
+    @effective_rate.setter
+    def effective_rate(self, value: float):
+        self._routes._effective_rate[self._index] = value
+
+    @property
+    def liquidity(self) -> float:
+        return float(self._routes._liquidity[self._index])
+
+    @liquidity.setter
+    def liquidity(self, value: float):
+        self._routes._liquidity[self._index] = value
+
+    @property
+    def balanced_score(self) -> Optional[float]:
+        score = self._routes._balanced_score[self._index]
+        return None if np.isnan(score) else float(score)
+
+    @balanced_score.setter
+    def balanced_score(self, value: Optional[float]):
+        self._routes._balanced_score[self._index] = np.nan if value is None else value
+
+    def __eq__(self, other):
+        if not isinstance(other, SwapRoute):
+            return NotImplemented
+        return (self.path == other.path and self.total_cost == other.total_cost
+                and self.effective_rate == other.effective_rate and self.liquidity == other.liquidity)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"SwapRoute(path={self.path!r}, total_cost={self.total_cost!r}, "
+                f"effective_rate={self.effective_rate!r}, liquidity={self.liquidity!r})")
+
+
+class RouteSet:
+    """
+    Conjunto de rotas armazenado em arrays planos.
+
+    Os caminhos de todas as rotas ficam concatenados em um único buffer
+    int32, delimitados por `offsets`; custos, taxas e liquidez ficam em
+    arrays paralelos. Ordenações e filtros operam sobre os arrays, sem criar
+    um objeto por rota. O conjunto também cresce com `add`, dobrando a
+    capacidade dos arrays, e serve de armazenamento para as rotas em cache
+    do modelo.
+    """
+    __slots__ = ('_nodes', '_offsets', '_total_cost', '_effective_rate', '_liquidity', '_balanced_score',
+                 '_size', 'asset_table')
+
+    def __init__(self, nodes: np.ndarray, offsets: np.ndarray, total_cost: np.ndarray,
+                 effective_rate: np.ndarray, liquidity: np.ndarray,
+                 balanced_score: Optional[np.ndarray] = None,
+                 asset_table: Optional[AssetTable] = None):
+        """
+        Args:
+            nodes: Buffer int32 com os caminhos concatenados
+            offsets: Início de cada caminho no buffer, com o fim do último na posição final (n_rotas + 1,)
+            total_cost: Custo total de cada rota
+            effective_rate: Taxa efetiva de cada rota
+            liquidity: Liquidez de cada rota
+            balanced_score: Score balanceado de cada rota (padrão: NaN)
+            asset_table: Tabela de internação dos ativos (padrão: tabela própria do conjunto)
+        """
+        self._nodes = np.asarray(nodes, dtype=np.int32)
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        # Cópias, pois as rotas do conjunto podem ser alteradas individualmente
+        self._total_cost = np.array(total_cost, dtype=float)
+        self._effective_rate = np.array(effective_rate, dtype=float)
+        self._liquidity = np.array(liquidity, dtype=float)
+        self._size = len(self._total_cost)
+        if balanced_score is None:
+            balanced_score = np.full(self._size, np.nan)
+        self._balanced_score = np.array(balanced_score, dtype=float)
+        self.asset_table = AssetTable() if asset_table is None else asset_table
+
+    @classmethod
+    def empty(cls, asset_table: Optional[AssetTable] = None, capacity: int = 16) -> 'RouteSet':
+        """
+        Cria um conjunto vazio com espaço para `capacity` rotas.
+        """
+        route_set = cls(np.empty(0, dtype=np.int32), np.zeros(1, dtype=np.int64), [], [], [],
+                        asset_table=asset_table)
+        route_set._reserve(capacity, 4 * capacity)
+        return route_set
+
+    @classmethod
+    def from_paths(cls, paths: Sequence[Sequence[str]], total_cost, effective_rate, liquidity,
+                   asset_table: Optional[AssetTable] = None) -> 'RouteSet':
+        """
+        Cria um conjunto a partir de caminhos com ids de ativos.
+
+        Args:
+            paths: Caminhos como listas de ids de ativos
+            total_cost: Custo total de cada rota
+            effective_rate: Taxa efetiva de cada rota
+            liquidity: Liquidez de cada rota
+            asset_table: Tabela de internação dos ativos
+
+        Returns:
+            RouteSet: Conjunto de rotas
+        """
+        table = AssetTable() if asset_table is None else asset_table
+        lengths = np.fromiter((len(path) for path in paths), dtype=np.int64, count=len(paths))
+        offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        nodes = np.fromiter((table.intern(asset_id) for path in paths for asset_id in path),
+                            dtype=np.int32, count=int(offsets[-1]))
+        return cls(nodes, offsets, total_cost, effective_rate, liquidity, asset_table=table)
+
+    @classmethod
+    def from_routes(cls, routes: Sequence[SwapRoute], asset_table: Optional[AssetTable] = None) -> 'RouteSet':
+        """
+        Cria um conjunto a partir de objetos SwapRoute.
+        """
+        route_set = cls.from_paths(
+            [route.path for route in routes],
+            [route.total_cost for route in routes],
+            [route.effective_rate for route in routes],
+            [route.liquidity for route in routes],
+            asset_table=asset_table
+        )
+        route_set.balanced_score = np.array([
+            np.nan if route.balanced_score is None else route.balanced_score for route in routes
+        ], dtype=float)
+        return route_set
+
+    def _reserve(self, num_routes: int, num_nodes: int):
+        # Garante capacidade para as rotas e nós informados, dobrando os arrays
+        capacity = len(self._total_cost)
+        if num_routes > capacity:
+            capacity = max(num_routes, 2 * capacity)
+            for name in ('_total_cost', '_effective_rate', '_liquidity', '_balanced_score'):
+                grown = np.full(capacity, np.nan)
+                grown[:self._size] = getattr(self, name)[:self._size]
+                setattr(self, name, grown)
+            offsets = np.zeros(capacity + 1, dtype=np.int64)
+            offsets[:self._size + 1] = self._offsets[:self._size + 1]
+            self._offsets = offsets
+
+        used = int(self._offsets[self._size])
+        if num_nodes > len(self._nodes):
+            nodes = np.empty(max(num_nodes, 2 * len(self._nodes)), dtype=np.int32)
+            nodes[:used] = self._nodes[:used]
+            self._nodes = nodes
+
+    def append(self, path: Union[Sequence[str], np.ndarray], total_cost: float, effective_rate: float,
+               liquidity: float, balanced_score: Optional[float] = None) -> int:
+        """
+        Acrescenta uma rota ao conjunto.
+
+        Args:
+            path: Caminho como lista de ids de ativos ou array de inteiros da tabela
+            total_cost: Custo total da rota
+            effective_rate: Taxa efetiva da rota
+            liquidity: Liquidez da rota
+            balanced_score: Score balanceado da rota, se calculado
+
+        Returns:
+            int: Posição da rota no conjunto
+        """
+        if not isinstance(path, np.ndarray):
+            path = [self.asset_table.intern(asset_id) for asset_id in path]
+
+        index = self._size
+        start = int(self._offsets[index])
+        self._reserve(index + 1, start + len(path))
+        self._nodes[start:start + len(path)] = path
+        self._offsets[index + 1] = start + len(path)
+        self._total_cost[index] = total_cost
+        self._effective_rate[index] = effective_rate
+        self._liquidity[index] = liquidity
+        self._balanced_score[index] = np.nan if balanced_score is None else balanced_score
+        self._size = index + 1
+        return index
+
+    def add(self, path: Union[Sequence[str], np.ndarray], total_cost: float, effective_rate: float,
+            liquidity: float, balanced_score: Optional[float] = None) -> SwapRoute:
+        """
+        Acrescenta uma rota ao conjunto e a retorna como SwapRoute.
+        """
+        return SwapRoute._bind(self, self.append(path, total_cost, effective_rate, liquidity, balanced_score))
+
+    @property
+    def nodes(self) -> np.ndarray:
+        """
+        Buffer int32 com os caminhos concatenados.
+        """
+        return self._nodes[:self._offsets[self._size]]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        Início de cada caminho no buffer, com o fim do último na posição final.
+        """
+        return self._offsets[:self._size + 1]
+
+    @property
+    def total_cost(self) -> np.ndarray:
+        return self._total_cost[:self._size]
+
+    @property
+    def effective_rate(self) -> np.ndarray:
+        return self._effective_rate[:self._size]
+
+    @property
+    def liquidity(self) -> np.ndarray:
+        return self._liquidity[:self._size]
+
+    @property
+    def balanced_score(self) -> np.ndarray:
+        return self._balanced_score[:self._size]
+
+    @balanced_score.setter
+    def balanced_score(self, values: np.ndarray):
+        self._balanced_score[:self._size] = values
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """
+        Número de ativos de cada caminho.
+        """
+        return np.diff(self.offsets)
+
+    @property
+    def sources(self) -> np.ndarray:
+        """
+        Ativo de origem (inteiro da tabela) de cada rota.
+        """
+        return self.nodes[self.offsets[:-1]]
+
+    @property
+    def targets(self) -> np.ndarray:
+        """
+        Ativo de destino (inteiro da tabela) de cada rota.
+        """
+        return self.nodes[self.offsets[1:] - 1]
+
+    def node_ids(self, i: int) -> np.ndarray:
+        """
+        Retorna uma view do caminho da rota i no buffer.
+        """
+        return self._nodes[self._offsets[i]:self._offsets[i + 1]]
+
+    def route(self, i: int) -> SwapRoute:
+        """
+        Retorna a rota i como SwapRoute, sem copiar os seus dados.
+        """
+        return SwapRoute._bind(self, i)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.route(int(key) % len(self) if key < 0 else int(key))
+        return self.take(np.arange(len(self))[key])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.route(i)
+
+    def to_list(self) -> List[SwapRoute]:
+        return list(self)
+
+    def take(self, indices: np.ndarray) -> 'RouteSet':
+        """
+        Retorna um novo conjunto com as rotas nas posições informadas.
+
+        Args:
+            indices: Posições das rotas, na ordem desejada
+
+        Returns:
+            RouteSet: Conjunto com as rotas selecionadas
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.offsets[indices]
+        lengths = self.offsets[indices + 1] - starts
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # Posição no buffer original de cada elemento dos caminhos selecionados
+        gather = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return RouteSet(self.nodes[gather], offsets, self.total_cost[indices],
+                        self.effective_rate[indices], self.liquidity[indices],
+                        self.balanced_score[indices], self.asset_table)
+
+    def compact(self, routes: Sequence[SwapRoute]) -> 'RouteSet':
+        """
+        Cria um conjunto só com as rotas informadas, reapontando-as para ele.
+
+        Usado para liberar o espaço de rotas descartadas de um armazenamento;
+        as rotas informadas devem pertencer a este conjunto.
+
+        Args:
+            routes: Rotas do conjunto que devem ser mantidas
+
+        Returns:
+            RouteSet: Novo conjunto com as rotas, na ordem informada
+        """
+        compacted = self.take(np.array([route._index for route in routes], dtype=np.int64))
+        for index, route in enumerate(routes):
+            route._routes = compacted
+            route._index = index
+        return compacted
+
+    def filter(self, mask: np.ndarray) -> 'RouteSet':
+        """
+        Retorna as rotas em que `mask` é verdadeiro.
+        """
+        return self.take(np.flatnonzero(mask))
+
+    def argsort(self, key: str = 'effective_rate', descending: bool = False) -> np.ndarray:
+        """
+        Retorna a ordem estável das rotas por um dos atributos numéricos.
+
+        Args:
+            key: 'total_cost', 'effective_rate', 'liquidity', 'balanced_score' ou 'lengths'
+            descending: Se True, ordena do maior para o menor
+
+        Returns:
+            np.ndarray: Posições das rotas ordenadas
+        """
+        values = getattr(self, key)
+        if descending:
+            # Negar mantém a estabilidade entre empates, como sorted(reverse=True)
+            values = -values
+        return np.argsort(values, kind='stable')
+
+    def sort(self, key: str = 'effective_rate', descending: bool = False) -> 'RouteSet':
+        """
+        Retorna as rotas ordenadas por um dos atributos numéricos.
+        """
+        return self.take(self.argsort(key, descending))
+
+    def top(self, k: int, key: str = 'effective_rate', descending: bool = False) -> 'RouteSet':
+        """
+        Retorna as k primeiras rotas pela ordenação de um atributo.
+        """
+        return self.take(self.argsort(key, descending)[:k])
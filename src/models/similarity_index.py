@@ -0,0 +1,233 @@
+import numpy as np
+from typing import Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - scipy é opcional
+    cKDTree = None
+
+
+class AssetSimilarityIndex:
+    """
+    Índice de vizinhos mais próximos sobre os vetores de ativos.
+
+    Usado para sugerir ativos substitutos com perfil semelhante de liquidez,
+    volume e permutas. As features são a matriz de vetores normalizados do
+    modelo, opcionalmente padronizada por componente. Com a métrica
+    euclidiana é usada uma KD-tree (scipy); com a métrica cosseno, ou sem
+    scipy, as consultas são feitas por força bruta em blocos com NumPy.
+    """
+
+    METRICS = ('euclidean', 'cosine')
+
+    def __init__(self, model, metric: str = 'euclidean', standardize: bool = True,
+                 block_size: int = 1024):
+        """
+        Inicializa o índice.
+
+        Args:
+            model: Instância de VectorialEconomicModel
+            metric: Métrica de distância ('euclidean' ou 'cosine')
+            standardize: Se True, padroniza cada componente (média 0, desvio 1)
+            block_size: Número de consultas por bloco na força bruta
+        """
+        if metric not in self.METRICS:
+            raise ValueError(f"Métrica {metric} não suportada")
+
+        self.model = model
+        self.metric = metric
+        self.standardize = standardize
+        self.block_size = block_size
+        self.refresh()
+
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
+
+    def _transform(self, vectors: np.ndarray) -> np.ndarray:
+        features = self._normalize(vectors)
+        if self.standardize:
+            features = (features - self._mean) / self._scale
+        if self.metric == 'cosine':
+            features = self._normalize(features)
+        return features
+
+    def _rebuild(self):
+        normalized = self._normalize(self._vectors)
+        self._mean = normalized.mean(axis=0)
+        std = normalized.std(axis=0)
+        self._scale = np.where(std > 0, std, 1.0)
+        self.features = self._transform(self._vectors)
+
+        if self.metric == 'euclidean' and cKDTree is not None and len(self.features):
+            self._tree = cKDTree(self.features)
+        else:
+            self._tree = None
+
+    def refresh(self, asset_ids: Optional[Iterable[str]] = None):
+        """
+        Atualiza o índice após mudanças nos ativos ou no grafo.
+
+        Só os vetores dos ativos informados são recalculados. Se o conjunto de
+        ativos do modelo mudou, ou nenhum ativo for informado, todos os vetores
+        são recalculados.
+
+        Args:
+            asset_ids: Ativos cujos atributos ou pools mudaram
+        """
+        if asset_ids is None or set(self.model.assets) != set(getattr(self, 'asset_index', {})):
+            self.asset_ids = list(self.model.assets)
+            self.asset_index = {asset_id: i for i, asset_id in enumerate(self.asset_ids)}
+            self._vectors = self.model.get_asset_matrix(self.asset_ids)
+        else:
+            for asset_id in asset_ids:
+                self._vectors[self.asset_index[asset_id]] = self.model.get_asset_vector(asset_id)
+
+        self._rebuild()
+
+    def affected_by_pool(self, asset_a: str, asset_b: str) -> Set[str]:
+        """
+        Retorna os ativos cujo vetor muda ao adicionar uma pool entre dois ativos.
+
+        As permutas indiretas contam vizinhos de vizinhos, então além dos dois
+        ativos da pool mudam também os seus vizinhos diretos.
+
+        Args:
+            asset_a: Primeiro ativo da pool
+            asset_b: Segundo ativo da pool
+
+        Returns:
+            Set[str]: Ativos afetados
+        """
+        graph = self.model.liquidity_graph
+        affected = {asset_a, asset_b}
+        for asset_id in (asset_a, asset_b):
+            if asset_id in graph:
+                affected.update(graph.predecessors(asset_id))
+        return affected
+
+    def refresh_pool(self, asset_a: str, asset_b: str):
+        """
+        Atualiza o índice após adicionar uma pool entre dois ativos.
+
+        Args:
+            asset_a: Primeiro ativo da pool
+            asset_b: Segundo ativo da pool
+        """
+        self.refresh(self.affected_by_pool(asset_a, asset_b))
+
+    def _query_features(self, queries: Union[str, List[str], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        if isinstance(queries, str):
+            queries = [queries]
+        if isinstance(queries, np.ndarray):
+            vectors = np.atleast_2d(queries)
+            return self._transform(vectors), np.full(len(vectors), -1)
+
+        rows = []
+        for asset_id in queries:
+            if asset_id not in self.asset_index:
+                raise ValueError("Ativo não encontrado no índice")
+            rows.append(self.asset_index[asset_id])
+        rows = np.array(rows, dtype=np.int64)
+        return self.features[rows], rows
+
+    def _distances(self, block: np.ndarray) -> np.ndarray:
+        if self.metric == 'cosine':
+            return 1.0 - block @ self.features.T
+        squared = (np.sum(block ** 2, axis=1)[:, None] + np.sum(self.features ** 2, axis=1)[None, :]
+                   - 2.0 * block @ self.features.T)
+        return np.sqrt(np.maximum(squared, 0.0))
+
+    def _knn(self, features: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(self.asset_ids))
+        if self._tree is not None:
+            distances, indices = self._tree.query(features, k=k)
+            return distances.reshape(len(features), k), indices.reshape(len(features), k)
+
+        distances = np.empty((len(features), k))
+        indices = np.empty((len(features), k), dtype=np.int64)
+        for start in range(0, len(features), self.block_size):
+            block = self._distances(features[start:start + self.block_size])
+            top = np.argpartition(block, k - 1, axis=1)[:, :k]
+            top_distances = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(top_distances, axis=1, kind='stable')
+            indices[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+            distances[start:start + len(block)] = np.take_along_axis(top_distances, order, axis=1)
+        return distances, indices
+
+    def query_batch(self, queries: Union[List[str], np.ndarray], k: int = 5,
+                    exclude_self: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encontra os k ativos mais próximos para várias consultas.
+
+        Args:
+            queries: Ativos do índice ou matriz (n_consultas, 6) de vetores brutos
+            k: Número de vizinhos
+            exclude_self: Se True, o próprio ativo consultado é excluído dos vizinhos
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Distâncias e índices em `asset_ids`, ambos (n_consultas, k)
+        """
+        features, rows = self._query_features(queries)
+        extra = 1 if exclude_self and np.any(rows >= 0) else 0
+        distances, indices = self._knn(features, k + extra)
+
+        if extra:
+            # Remove o próprio ativo (ou o último vizinho, se ele não aparecer)
+            keep = indices != rows[:, None]
+            keep[keep.sum(axis=1) > k, -1] = False
+            distances = distances[keep].reshape(len(features), -1)
+            indices = indices[keep].reshape(len(features), -1)
+
+        return distances, indices
+
+    def query(self, asset_id: Union[str, np.ndarray], k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Encontra os k ativos mais parecidos com um ativo.
+
+        Args:
+            asset_id: Ativo do índice ou vetor bruto (6,)
+            k: Número de vizinhos
+
+        Returns:
+            List[Tuple[str, float]]: Pares (ativo, distância), do mais próximo ao mais distante
+        """
+        distances, indices = self.query_batch(asset_id if isinstance(asset_id, np.ndarray) else [asset_id], k)
+        return [(self.asset_ids[i], float(d)) for d, i in zip(distances[0], indices[0])]
+
+    def query_radius(self, asset_id: Union[str, np.ndarray], radius: float) -> List[Tuple[str, float]]:
+        """
+        Encontra todos os ativos a até `radius` de um ativo.
+
+        Args:
+            asset_id: Ativo do índice ou vetor bruto (6,)
+            radius: Distância máxima
+
+        Returns:
+            List[Tuple[str, float]]: Pares (ativo, distância), ordenados por distância
+        """
+        features, rows = self._query_features(asset_id if isinstance(asset_id, np.ndarray) else [asset_id])
+        if self._tree is not None:
+            candidates = np.array(self._tree.query_ball_point(features[0], radius), dtype=np.int64)
+            distances = np.linalg.norm(self.features[candidates] - features[0], axis=1)
+        else:
+            all_distances = self._distances(features)[0]
+            candidates = np.flatnonzero(all_distances <= radius)
+            distances = all_distances[candidates]
+
+        order = np.argsort(distances, kind='stable')
+        return [(self.asset_ids[i], float(d)) for i, d in zip(candidates[order], distances[order])
+                if i != rows[0]]
+
+    def substitutes(self, asset_id: str, k: int = 3) -> List[str]:
+        """
+        Sugere ativos substitutos para um ativo, por exemplo quando uma rota falha.
+
+        Args:
+            asset_id: Identificador do ativo
+            k: Número de sugestões
+
+        Returns:
+            List[str]: Ativos mais parecidos, do mais próximo ao mais distante
+        """
+        return [neighbor for neighbor, _ in self.query(asset_id, k)]
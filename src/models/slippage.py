@@ -0,0 +1,100 @@
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+# Fórmulas dos modelos de slippage das pools, em função da quantidade trocada e
+# da liquidez da pool. Valem tanto para escalares quanto para arrays.
+SLIPPAGE_FUNCTIONS = {
+    'linear': lambda amount, liquidity: (amount / liquidity) * 0.5,  # Modelo linear simples
+    'quadratic': lambda amount, liquidity: (amount / liquidity) ** 2,  # Modelo quadrático
+    'constant': lambda amount, liquidity: 0.01,  # Slippage constante de 1%
+}
+
+# Códigos dos modelos de slippage usados nas representações em arrays
+SLIPPAGE_MODELS = tuple(SLIPPAGE_FUNCTIONS)
+NO_SLIPPAGE = len(SLIPPAGE_MODELS)
+
+
+def slippage_code(slippage_model: str) -> int:
+    """
+    Código inteiro de um modelo de slippage (NO_SLIPPAGE se desconhecido).
+    """
+    return SLIPPAGE_MODELS.index(slippage_model) if slippage_model in SLIPPAGE_FUNCTIONS else NO_SLIPPAGE
+
+
+def swap_slippage(slippage_model: str, amount: float, liquidity: float) -> float:
+    """
+    Slippage de uma troca em uma pool.
+
+    Args:
+        slippage_model: Modelo de slippage da pool
+        amount: Quantidade trocada
+        liquidity: Liquidez da pool
+
+    Returns:
+        float: Slippage estimado (0.0 para modelos desconhecidos)
+    """
+    function = SLIPPAGE_FUNCTIONS.get(slippage_model)
+    if function is None:
+        return 0.0  # Sem slippage
+    return function(amount, liquidity)
+
+
+def slippage_array(codes: np.ndarray, amounts: np.ndarray, liquidity: np.ndarray) -> np.ndarray:
+    """
+    Versão vetorizada de `swap_slippage` sobre modelos codificados por `slippage_code`.
+
+    Args:
+        codes: Código do modelo de slippage de cada pool
+        amounts: Quantidades trocadas, com broadcast contra `liquidity`
+        liquidity: Liquidez das pools
+
+    Returns:
+        np.ndarray: Slippage de cada pool
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        choices = [np.broadcast_to(function(amounts, liquidity), np.broadcast(amounts, liquidity).shape)
+                   for function in SLIPPAGE_FUNCTIONS.values()]
+    return np.select([codes == code for code in range(len(SLIPPAGE_MODELS))], choices, 0.0)
+
+
+def edge_cost(data: Dict, amount: float) -> Optional[float]:
+    """
+    Custo (taxa + slippage) de uma troca em uma aresta do grafo de liquidez.
+
+    Args:
+        data: Atributos da aresta no grafo de liquidez
+        amount: Quantidade trocada
+
+    Returns:
+        Optional[float]: Custo da aresta, ou None se a liquidez for insuficiente
+    """
+    if amount > data['weight']:
+        return None
+    return data['swap_fee'] + swap_slippage(data['slippage_model'], amount, data['weight'])
+
+
+def path_effective_rate(edges: Iterable[Dict], amount: float) -> float:
+    """
+    Taxa efetiva de uma rota, descontando a taxa e o slippage de cada hop da
+    quantidade repassada ao hop seguinte.
+
+    Args:
+        edges: Atributos das arestas da rota, em ordem
+        amount: Quantidade inicial a ser trocada
+
+    Returns:
+        float: Taxa efetiva total
+    """
+    total_rate = 0.0
+    current_amount = amount
+
+    for data in edges:
+        swap_fee = data['swap_fee']
+        hop_slippage = swap_slippage(data['slippage_model'], current_amount, data['weight'])
+
+        total_rate += swap_fee + hop_slippage
+
+        # Atualiza a quantidade para o próximo hop
+        current_amount = current_amount * (1 - swap_fee - hop_slippage)
+
+    return total_rate
@@ -0,0 +1,205 @@
+import numpy as np
+from typing import Dict, List, Optional, Union
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+
+from src.models.batched_routing import EdgeArrays, edge_costs, shortest_paths, path_reduce
+
+
+@dataclass
+class StressTestResult:
+    """Resultado de uma simulação de choques de liquidez."""
+    asset_ids: List[str]
+    target: str
+    base_values: np.ndarray
+    values: np.ndarray
+    holding_assets: np.ndarray
+    holding_amounts: np.ndarray
+    costs: np.ndarray
+    slippage: np.ndarray
+    feasible: np.ndarray
+
+    def losses(self) -> np.ndarray:
+        """
+        Retorna a perda de cada carteira em cada cenário (n_cenários, n_carteiras).
+        """
+        return self.base_values - self.values
+
+    def value_at_risk(self, confidence: float = 0.95) -> np.ndarray:
+        """
+        Calcula o valor em risco de cada carteira sobre os cenários.
+
+        Args:
+            confidence: Nível de confiança
+
+        Returns:
+            np.ndarray: Perda no quantil `confidence` (n_carteiras,)
+        """
+        return np.quantile(self.losses(), confidence, axis=0)
+
+
+def _simulate_chunk(edges: EdgeArrays, multipliers: np.ndarray, sources: np.ndarray,
+                    amounts: np.ndarray, target: int, direct_edges: np.ndarray,
+                    max_hops: Optional[int]):
+    scenarios, holdings = len(multipliers), len(sources)
+    liquidity = edges.liquidity * multipliers
+
+    # Um problema de roteamento por par (cenário, posição)
+    batch_liquidity = np.repeat(liquidity, holdings, axis=0)
+    batch_amounts = np.tile(amounts, scenarios)[:, None]
+    batch_sources = np.tile(sources, scenarios)
+    costs = edge_costs(edges, batch_amounts, batch_liquidity)
+
+    dist, pred = shortest_paths(edges, batch_sources, costs, max_hops)
+    total = dist[:, target]
+    fees, _, _ = path_reduce(edges, pred, np.full(len(batch_sources), target),
+                             np.broadcast_to(edges.swap_fee, costs.shape))
+
+    # Como em `find_best_swap_route`, a rota direta tem prioridade quando viável
+    batch_direct = np.tile(direct_edges, scenarios)
+    rows = np.arange(len(batch_sources))
+    safe_direct = np.where(batch_direct >= 0, batch_direct, 0)
+    direct_cost = costs[rows, safe_direct]
+    use_direct = (batch_direct >= 0) & np.isfinite(direct_cost)
+    total = np.where(use_direct, direct_cost, total)
+    fees = np.where(use_direct, edges.swap_fee[safe_direct], fees)
+
+    feasible = np.isfinite(total)
+    slip = np.where(feasible, total - fees, np.inf)
+    shape = (scenarios, holdings)
+    return total.reshape(shape), slip.reshape(shape), feasible.reshape(shape)
+
+
+class LiquidityShockSimulator:
+    """
+    Simulador Monte Carlo de choques de liquidez nas pools.
+
+    Cada cenário é uma linha de uma matriz (n_cenários, n_arestas) de
+    multiplicadores da liquidez das arestas, na ordem de `edges`. Para cada
+    cenário e posição das carteiras é calculada a melhor rota até o ativo de
+    liquidação, e o valor da posição é descontado pelo custo da rota (zero se
+    não houver rota viável). Os cenários são processados em blocos para
+    limitar a memória, opcionalmente em paralelo entre processos.
+    """
+
+    def __init__(self, model, max_chunk_elements: int = 2_000_000, n_jobs: int = 1,
+                 max_hops: Optional[int] = None):
+        """
+        Inicializa o simulador.
+
+        Args:
+            model: Instância de VectorialEconomicModel
+            max_chunk_elements: Máximo de elementos (cenários x posições x arestas) por bloco
+            n_jobs: Número de processos para os blocos (1 = sem paralelismo)
+            max_hops: Número máximo de hops das rotas (padrão: sem limite)
+        """
+        self.model = model
+        self.max_chunk_elements = max_chunk_elements
+        self.n_jobs = n_jobs
+        self.max_hops = max_hops
+
+        self.edges = EdgeArrays.from_model(model)
+        self.asset_ids = self.edges.asset_ids
+        self.asset_index = {asset_id: i for i, asset_id in enumerate(self.asset_ids)}
+        self.scores = model.get_asset_values(self.asset_ids)
+
+    def random_scenarios(self, num_scenarios: int, drain_probability: float = 0.1,
+                         max_drain: float = 1.0, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Gera cenários aleatórios de drenagem de pools.
+
+        Cada pool é drenada com probabilidade `drain_probability`, perdendo uma
+        fração uniforme em [0, max_drain] da liquidez. As duas direções da pool
+        recebem o mesmo multiplicador.
+
+        Args:
+            num_scenarios: Número de cenários
+            drain_probability: Probabilidade de uma pool ser drenada
+            max_drain: Fração máxima de liquidez removida
+            seed: Semente para reprodutibilidade
+
+        Returns:
+            np.ndarray: Multiplicadores (n_cenários, n_arestas)
+        """
+        rng = np.random.default_rng(seed)
+        edges = self.edges
+        pool = np.where(edges.reverse >= 0, np.minimum(np.arange(edges.num_edges), edges.reverse),
+                        np.arange(edges.num_edges))
+
+        drained = rng.random((num_scenarios, edges.num_edges)) < drain_probability
+        drain = rng.uniform(0.0, max_drain, (num_scenarios, edges.num_edges))
+        multipliers = np.where(drained, 1.0 - drain, 1.0)
+        return multipliers[:, pool]
+
+    def run(self, portfolios: Union[np.ndarray, List[Dict[str, float]]], target: str,
+            multipliers: np.ndarray) -> StressTestResult:
+        """
+        Avalia as carteiras em todos os cenários de choque.
+
+        Args:
+            portfolios: Carteiras, como matriz (n_carteiras, n_ativos) ou lista de dicionários
+            target: Ativo para o qual as posições são roteadas
+            multipliers: Multiplicadores de liquidez (n_cenários, n_arestas)
+
+        Returns:
+            StressTestResult: Valores, custos, slippage e viabilidade por cenário
+        """
+        if target not in self.asset_index:
+            raise ValueError("Ativo não encontrado no modelo")
+        multipliers = np.atleast_2d(np.asarray(multipliers, dtype=float))
+        if multipliers.shape[1] != self.edges.num_edges:
+            raise ValueError(f"Esperado {self.edges.num_edges} multiplicadores por cenário")
+
+        matrix = self.model.get_portfolio_matrix(portfolios, self.asset_ids)
+        # Valores unitários atuais dos ativos (o modelo mantém a matriz em cache)
+        self.scores = self.model.get_asset_values(self.asset_ids)
+        target_index = self.asset_index[target]
+        unit_values = matrix * self.scores
+
+        # Posições idênticas em carteiras diferentes são roteadas uma única vez
+        positions = np.argwhere((matrix > 0) & (np.arange(len(self.asset_ids)) != target_index))
+        pairs = np.column_stack([positions[:, 1], matrix[positions[:, 0], positions[:, 1]]])
+        unique_pairs, holding_of_position = np.unique(pairs, axis=0, return_inverse=True)
+        holding_of_position = holding_of_position.ravel()
+        sources = unique_pairs[:, 0].astype(np.int64)
+        amounts = unique_pairs[:, 1]
+        direct_edges = np.array([self.edges.edge_index(s, target_index) for s in sources], dtype=np.int64)
+
+        num_scenarios = len(multipliers)
+        per_scenario = max(1, len(sources) * max(self.edges.num_edges, 1))
+        chunk = max(1, self.max_chunk_elements // per_scenario)
+        bounds = [(start, min(start + chunk, num_scenarios)) for start in range(0, num_scenarios, chunk)]
+        args = [(self.edges, multipliers[start:end], sources, amounts, target_index,
+                 direct_edges, self.max_hops) for start, end in bounds]
+
+        if self.n_jobs > 1 and len(bounds) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                results = list(executor.map(_simulate_chunk, *zip(*args)))
+        else:
+            results = [_simulate_chunk(*a) for a in args]
+
+        if results:
+            costs = np.concatenate([r[0] for r in results])
+            slip = np.concatenate([r[1] for r in results])
+            feasible = np.concatenate([r[2] for r in results])
+        else:
+            costs = slip = np.zeros((0, len(sources)))
+            feasible = np.zeros((0, len(sources)), dtype=bool)
+
+        # Valor de cada posição descontado pelo custo da rota
+        retained = np.where(feasible, np.clip(1.0 - costs, 0.0, None), 0.0)
+        values = np.tile(unit_values[:, target_index], (num_scenarios, 1))
+        position_values = unit_values[positions[:, 0], positions[:, 1]] * retained[:, holding_of_position]
+        np.add.at(values, (slice(None), positions[:, 0]), position_values)
+
+        return StressTestResult(
+            asset_ids=list(self.asset_ids),
+            target=target,
+            base_values=unit_values.sum(axis=1),
+            values=values,
+            holding_assets=sources,
+            holding_amounts=amounts,
+            costs=costs,
+            slippage=slip,
+            feasible=feasible
+        )
@@ -0,0 +1,286 @@
+import hashlib
+import numpy as np
+from typing import List, Optional, Union
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class AssetVectorHistory:
+    """
+    Histórico colunar dos vetores de ativos ao longo do tempo.
+
+    Cada tick armazena a matriz (n_ativos, 6) retornada por
+    `VectorialEconomicModel.get_asset_matrix` em um buffer circular
+    pré-alocado. O buffer tem o dobro da capacidade e cada tick é gravado
+    em duas posições, de modo que a janela mais recente é sempre uma fatia
+    contígua do buffer e pode ser exposta como view, sem cópias.
+    """
+
+    COMPONENTS = ('liquidity', 'volume', 'price_impact', 'exchange_score', 'utility', 'confidence')
+
+    # Cabeçalho do arquivo mapeado: ticks gravados, capacidade, ativos, componentes,
+    # dtype e hash dos ids dos ativos (em ordem)
+    HEADER_FIELDS = 6
+
+    @staticmethod
+    def _asset_hash(asset_ids: List[str]) -> int:
+        # Hash estável (entre processos) da sequência de ids, como int64
+        digest = hashlib.blake2b('\x1f'.join(asset_ids).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little', signed=True)
+
+    def __init__(self, asset_ids: List[str], capacity: Optional[int] = None, dtype=np.float64,
+                 filename: Optional[str] = None, mode: str = 'w+'):
+        """
+        Inicializa o histórico.
+
+        Com `filename`, o buffer, os instantes e o contador de ticks ficam no
+        arquivo mapeado, então o histórico pode ser reaberto com mode='r+'.
+
+        Args:
+            asset_ids: Ativos acompanhados, na ordem das linhas da matriz
+            capacity: Número máximo de ticks mantidos no histórico (lido do arquivo com mode='r+')
+            dtype: Tipo numérico do buffer
+            filename: Se informado, o histórico é mapeado em memória neste arquivo
+            mode: 'w+' cria (e sobrescreve) o arquivo; 'r+' reabre um histórico existente
+        """
+        if mode not in ('w+', 'r+'):
+            raise ValueError(f"Modo {mode} não suportado")
+
+        self.asset_ids = list(asset_ids)
+        self.asset_index = {asset_id: i for i, asset_id in enumerate(self.asset_ids)}
+        dtype = np.dtype(dtype)
+        asset_hash = self._asset_hash(self.asset_ids)
+
+        if filename is not None and mode == 'r+':
+            header = np.memmap(filename, dtype=np.int64, mode='r', shape=(self.HEADER_FIELDS,))
+            _, stored_capacity, num_assets, num_components, dtype_num, stored_hash = (int(value) for value in header)
+            del header
+            if capacity is not None and capacity != stored_capacity:
+                raise ValueError(f"Capacidade {capacity} difere da do arquivo ({stored_capacity})")
+            if (num_assets, num_components) != (len(self.asset_ids), len(self.COMPONENTS)):
+                raise ValueError("Ativos ou componentes diferentes dos do arquivo")
+            if stored_hash != asset_hash:
+                raise ValueError("Ativos diferentes dos do arquivo (ids ou ordem)")
+            if dtype_num != dtype.num:
+                raise ValueError("Tipo numérico diferente do do arquivo")
+            capacity = stored_capacity
+        elif filename is not None and capacity is None:
+            raise ValueError("Informe a capacidade do histórico")
+
+        if capacity is None or capacity <= 0:
+            raise ValueError("A capacidade do histórico deve ser positiva")
+        self.capacity = capacity
+
+        shape = (2 * capacity, len(self.asset_ids), len(self.COMPONENTS))
+        if filename is not None:
+            header_bytes = self.HEADER_FIELDS * 8
+            self._header = np.memmap(filename, dtype=np.int64, mode=mode, shape=(self.HEADER_FIELDS,))
+            self._timestamps = np.memmap(filename, dtype=np.float64, mode='r+', offset=header_bytes,
+                                         shape=(2 * capacity,))
+            self._buffer = np.memmap(filename, dtype=dtype, mode='r+', offset=header_bytes + 16 * capacity,
+                                     shape=shape)
+            if mode == 'w+':
+                self._header[:] = (0, capacity, shape[1], shape[2], dtype.num, asset_hash)
+                self._timestamps[:] = np.nan
+        else:
+            self._header = np.array([0, capacity, shape[1], shape[2], dtype.num, asset_hash], dtype=np.int64)
+            self._timestamps = np.full(2 * capacity, np.nan)
+            self._buffer = np.zeros(shape, dtype=dtype)
+
+    @property
+    def _ticks(self) -> int:
+        # Total de ticks gravados desde a criação
+        return int(self._header[0])
+
+    def __len__(self) -> int:
+        return min(self._ticks, self.capacity)
+
+    def append(self, vectors: np.ndarray, timestamp: Optional[float] = None):
+        """
+        Adiciona um tick ao histórico.
+
+        Args:
+            vectors: Matriz (n_ativos, 6) com os vetores dos ativos
+            timestamp: Instante do tick (padrão: número sequencial do tick)
+        """
+        vectors = np.asarray(vectors)
+        if vectors.shape != self._buffer.shape[1:]:
+            raise ValueError(f"Matriz de vetores com formato inválido: {vectors.shape}")
+
+        slot = self._ticks % self.capacity
+        self._buffer[slot] = vectors
+        self._buffer[slot + self.capacity] = vectors
+
+        if timestamp is None:
+            timestamp = float(self._ticks)
+        self._timestamps[slot] = timestamp
+        self._timestamps[slot + self.capacity] = timestamp
+
+        self._header[0] += 1
+
+    def record(self, model, timestamp: Optional[float] = None):
+        """
+        Grava o estado atual dos ativos de um modelo como um novo tick.
+
+        Args:
+            model: Instância de VectorialEconomicModel
+            timestamp: Instante do tick
+        """
+        self.append(model.get_asset_matrix(self.asset_ids), timestamp)
+
+    def _window_bounds(self, length: Optional[int]):
+        available = len(self)
+        if length is None:
+            length = available
+        if length <= 0 or length > available:
+            raise ValueError(f"Janela inválida: {length} (ticks disponíveis: {available})")
+
+        # O tick mais recente está sempre na metade superior do buffer
+        end = (self._ticks - 1) % self.capacity + self.capacity + 1
+        return end - length, end
+
+    def _component_index(self, component: Union[str, int, None]):
+        if component is None:
+            return slice(None)
+        if isinstance(component, str):
+            if component not in self.COMPONENTS:
+                raise ValueError(f"Componente {component} não encontrado")
+            return self.COMPONENTS.index(component)
+        return component
+
+    def window(self, length: Optional[int] = None,
+               component: Union[str, int, None] = None) -> np.ndarray:
+        """
+        Retorna uma view dos últimos ticks, do mais antigo para o mais recente.
+
+        Args:
+            length: Número de ticks (padrão: todo o histórico disponível)
+            component: Componente do vetor a selecionar (padrão: todos)
+
+        Returns:
+            np.ndarray: View (length, n_ativos, 6) ou (length, n_ativos) se um componente for selecionado
+        """
+        start, end = self._window_bounds(length)
+        return self._buffer[start:end, :, self._component_index(component)]
+
+    def timestamps(self, length: Optional[int] = None) -> np.ndarray:
+        """
+        Retorna uma view dos instantes dos últimos ticks.
+
+        Args:
+            length: Número de ticks (padrão: todo o histórico disponível)
+
+        Returns:
+            np.ndarray: View (length,) com os instantes
+        """
+        start, end = self._window_bounds(length)
+        return self._timestamps[start:end]
+
+    def latest(self, component: Union[str, int, None] = None) -> np.ndarray:
+        """
+        Retorna uma view do tick mais recente.
+
+        Args:
+            component: Componente do vetor a selecionar (padrão: todos)
+
+        Returns:
+            np.ndarray: View (n_ativos, 6) ou (n_ativos,)
+        """
+        return self.window(1, component)[0]
+
+    def asset_series(self, asset_id: str, length: Optional[int] = None) -> np.ndarray:
+        """
+        Retorna uma view da série temporal dos vetores de um ativo.
+
+        Args:
+            asset_id: Identificador do ativo
+            length: Número de ticks (padrão: todo o histórico disponível)
+
+        Returns:
+            np.ndarray: View (length, 6)
+        """
+        if asset_id not in self.asset_index:
+            raise ValueError("Ativo não encontrado no histórico")
+
+        return self.window(length)[:, self.asset_index[asset_id]]
+
+    def rolling_mean(self, window: int, length: Optional[int] = None,
+                     component: Union[str, int, None] = None) -> np.ndarray:
+        """
+        Calcula a média móvel de todos os ativos e componentes.
+
+        Args:
+            window: Tamanho da janela móvel em ticks
+            length: Número de ticks considerados (padrão: todo o histórico disponível)
+            component: Componente do vetor a selecionar (padrão: todos)
+
+        Returns:
+            np.ndarray: Médias (length - window + 1, n_ativos[, 6])
+        """
+        windows = sliding_window_view(self.window(length, component), window, axis=0)
+        return windows.mean(axis=-1)
+
+    def rolling_volatility(self, window: int, length: Optional[int] = None,
+                           component: Union[str, int, None] = None,
+                           returns: bool = True) -> np.ndarray:
+        """
+        Calcula a volatilidade móvel (desvio padrão amostral) de todos os ativos e componentes.
+
+        Args:
+            window: Tamanho da janela móvel em ticks
+            length: Número de ticks considerados (padrão: todo o histórico disponível)
+            component: Componente do vetor a selecionar (padrão: todos)
+            returns: Se True, usa as variações relativas entre ticks; se False, os próprios níveis
+
+        Returns:
+            np.ndarray: Volatilidades (n_janelas, n_ativos[, 6])
+        """
+        if window < 2:
+            raise ValueError("A janela de volatilidade deve ter ao menos 2 ticks")
+
+        series = self.window(length, component)
+        if returns:
+            previous = series[:-1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                series = np.where(previous != 0, np.diff(series, axis=0) / previous, 0.0)
+
+        windows = sliding_window_view(series, window, axis=0)
+        return windows.std(axis=-1, ddof=1)
+
+    def ema(self, span: Optional[float] = None, alpha: Optional[float] = None,
+            length: Optional[int] = None,
+            component: Union[str, int, None] = None) -> np.ndarray:
+        """
+        Calcula a média móvel exponencial de todos os ativos e componentes.
+
+        Args:
+            span: Período equivalente da média (alpha = 2 / (span + 1))
+            alpha: Fator de suavização em (0, 1]; alternativa a span
+            length: Número de ticks considerados (padrão: todo o histórico disponível)
+            component: Componente do vetor a selecionar (padrão: todos)
+
+        Returns:
+            np.ndarray: Série suavizada com o mesmo formato da janela
+        """
+        if alpha is None:
+            if span is None:
+                raise ValueError("Informe span ou alpha")
+            alpha = 2.0 / (span + 1.0)
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha deve estar no intervalo (0, 1]")
+
+        series = self.window(length, component)
+        result = np.empty(series.shape)
+        result[0] = series[0]
+        for t in range(1, len(series)):
+            result[t] = alpha * series[t] + (1.0 - alpha) * result[t - 1]
+
+        return result
+
+    def flush(self):
+        """
+        Persiste o histórico em disco quando mapeado em memória.
+        """
+        if isinstance(self._buffer, np.memmap):
+            self._buffer.flush()
+            self._timestamps.flush()
+            self._header.flush()
@@ -1,29 +1,37 @@
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 import networkx as nx
-from dataclasses import dataclass
 from collections import defaultdict
 
-@dataclass
-class SwapRoute:
-    """Representa uma rota de swap entre dois ativos."""
-    path: List[str]
-    total_cost: float
-    effective_rate: float
-    liquidity: float
+from src.models.backends import create_backend
+from src.models.routes import AssetTable, RouteSet, SwapRoute
+from src.models.slippage import path_effective_rate, swap_slippage
 
 class VectorialEconomicModel:
     """
     Modelo de análise econômica vetorial para avaliação de carteiras de ativos em DeFi.
     """
     
-    def __init__(self):
+    def __init__(self, backend='reference'):
+        """
+        Inicializa o modelo.
+        
+        Args:
+            backend: Backend dos algoritmos de grafo ('reference', 'csgraph', subclasse ou instância de GraphBackend)
+        """
         # Grafo direcionado para representar as pools de liquidez
         self.liquidity_graph = nx.DiGraph()
         # Dicionário para armazenar informações dos ativos
         self.assets = {}
-        # Cache para rotas de swap
+        # Tabela de internação dos ativos usada pelos caminhos das rotas
+        self.asset_table = AssetTable()
+        # Cache para rotas de swap, guardadas nos arrays planos de route_store
         self.route_cache = {}
+        self.route_store = RouteSet.empty(self.asset_table)
+        # Cache da matriz normalizada de vetores de ativos
+        self.vector_cache = None
+        # Backend dos algoritmos de rota, alcance e componentes
+        self.backend = create_backend(backend, self)
         
     def add_asset(self, asset_id: str, initial_liquidity: float):
         """
@@ -42,6 +50,11 @@ class VectorialEconomicModel:
             'utility': 0.0,
             'confidence': 0.0
         }
+        # Ativos sem pools também são vértices do grafo
+        self.liquidity_graph.add_node(asset_id)
+        self.asset_table.intern(asset_id)
+        self.vector_cache = None
+        self.backend.invalidate()
         
     def add_liquidity_pool(self, asset_a: str, asset_b: str, liquidity: float, 
                           swap_fee: float = 0.003, slippage_model: str = 'linear'):
@@ -74,8 +87,11 @@ class VectorialEconomicModel:
         if asset_a not in self.assets[asset_b]['exchange_routes']:
             self.assets[asset_b]['exchange_routes'].append(asset_a)
             
-        # Limpa o cache de rotas
+        # Limpa os caches de rotas e vetores
         self.route_cache = {}
+        self.route_store = RouteSet.empty(self.asset_table)
+        self.vector_cache = None
+        self.backend.invalidate()
         
     def calculate_slippage(self, asset_a: str, asset_b: str, amount: float) -> float:
         """
@@ -95,18 +111,8 @@ class VectorialEconomicModel:
         if not self.liquidity_graph.has_edge(asset_a, asset_b):
             return float('inf')  # Sem liquidez direta
             
-        liquidity = self.liquidity_graph[asset_a][asset_b]['weight']
-        slippage_model = self.liquidity_graph[asset_a][asset_b]['slippage_model']
-        
-        # Diferentes modelos de slippage
-        if slippage_model == 'linear':
-            return (amount / liquidity) * 0.5  # Modelo linear simples
-        elif slippage_model == 'quadratic':
-            return (amount / liquidity) ** 2  # Modelo quadrático
-        elif slippage_model == 'constant':
-            return 0.01  # Slippage constante de 1%
-        else:
-            return 0.0  # Sem slippage
+        data = self.liquidity_graph[asset_a][asset_b]
+        return swap_slippage(data['slippage_model'], amount, data['weight'])
             
     def calculate_indirect_liquidity(self, asset_a: str, asset_b: str) -> float:
         """
@@ -171,7 +177,7 @@ class VectorialEconomicModel:
             
             if amount <= liquidity:
                 total_cost = swap_fee + slippage
-                route = SwapRoute(
+                route = self.route_store.add(
                     path=[asset_a, asset_b],
                     total_cost=total_cost,
                     effective_rate=total_cost,
@@ -180,57 +186,14 @@ class VectorialEconomicModel:
                 self.route_cache[cache_key] = route
                 return route
                 
-        # Encontra a melhor rota indireta usando Dijkstra modificado
+        # Encontra a melhor rota indireta usando o backend de grafo
         try:
-            # Inicializa estruturas de dados
-            costs = {node: float('inf') for node in self.liquidity_graph.nodes()}
-            costs[asset_a] = 0
-            predecessors = {node: None for node in self.liquidity_graph.nodes()}
-            visited = set()
-            
-            # Algoritmo de Dijkstra modificado
-            while len(visited) < len(self.liquidity_graph.nodes()):
-                # Encontra o vértice não visitado com menor custo
-                current = min((node for node in self.liquidity_graph.nodes() if node not in visited), 
-                             key=lambda x: costs[x])
-                
-                if current == asset_b:
-                    break
-                    
-                visited.add(current)
-                
-                # Atualiza os custos para os vizinhos
-                for neighbor in self.liquidity_graph.neighbors(current):
-                    if neighbor in visited:
-                        continue
-                        
-                    # Calcula o custo de swap
-                    liquidity = self.liquidity_graph[current][neighbor]['weight']
-                    swap_fee = self.liquidity_graph[current][neighbor]['swap_fee']
-                    
-                    # Se a quantidade é maior que a liquidez, o custo é infinito
-                    if amount > liquidity:
-                        edge_cost = float('inf')
-                    else:
-                        slippage = self.calculate_slippage(current, neighbor, amount)
-                        edge_cost = swap_fee + slippage
-                        
-                    new_cost = costs[current] + edge_cost
-                    if new_cost < costs[neighbor]:
-                        costs[neighbor] = new_cost
-                        predecessors[neighbor] = current
-                        
-            # Reconstrói a rota
-            if costs[asset_b] == float('inf'):
+            path, total_cost = self.backend.shortest_route(asset_a, asset_b, amount)
+            
+            if path is None:
                 self.route_cache[cache_key] = None
                 return None
                 
-            path = []
-            current = asset_b
-            while current is not None:
-                path.insert(0, current)
-                current = predecessors[current]
-                
             # Calcula a liquidez efetiva da rota
             route_liquidity = float('inf')
             for i in range(len(path) - 1):
@@ -240,9 +203,9 @@ class VectorialEconomicModel:
             # Calcula a taxa efetiva
             effective_rate = self.calculate_effective_rate(path, amount)
             
-            route = SwapRoute(
+            route = self.route_store.add(
                 path=path,
-                total_cost=costs[asset_b],
+                total_cost=total_cost,
                 effective_rate=effective_rate,
                 liquidity=route_liquidity
             )
@@ -265,22 +228,10 @@ class VectorialEconomicModel:
         Returns:
             float: Taxa efetiva total
         """
-        total_rate = 0.0
-        current_amount = amount
-        
-        for i in range(len(path) - 1):
-            asset_a = path[i]
-            asset_b = path[i+1]
-            
-            swap_fee = self.liquidity_graph[asset_a][asset_b]['swap_fee']
-            slippage = self.calculate_slippage(asset_a, asset_b, current_amount)
-            
-            total_rate += swap_fee + slippage
-            
-            # Atualiza a quantidade para o próximo hop
-            current_amount = current_amount * (1 - swap_fee - slippage)
-            
-        return total_rate
+        return path_effective_rate(
+            (self.liquidity_graph[path[i]][path[i+1]] for i in range(len(path) - 1)),
+            amount
+        )
         
     def calculate_bargaining_power(self, asset_id: str) -> float:
         """
@@ -369,7 +320,129 @@ class VectorialEconomicModel:
             utility,
             confidence
         ])
+
+    def get_asset_matrix(self, asset_ids: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Retorna a matriz de vetores de ativos, uma linha por ativo.
+
+        Args:
+            asset_ids: Ativos na ordem desejada (padrão: todos os ativos do modelo)
+
+        Returns:
+            np.ndarray: Matriz (n_ativos, 6) com os vetores de `get_asset_vector`
+        """
+        if asset_ids is None:
+            asset_ids = list(self.assets)
+
+        matrix = np.zeros((len(asset_ids), 6))
+        for i, asset_id in enumerate(asset_ids):
+            matrix[i] = self.get_asset_vector(asset_id)
+
+        return matrix
+
+    # Atributos escalares dos ativos que compõem o vetor de `get_asset_vector`
+    VECTOR_ATTRIBUTES = ('liquidity', 'volume', 'price_impact', 'utility', 'confidence')
+
+    def update_asset(self, asset_id: str, **attributes):
+        """
+        Atualiza atributos de um ativo (volume, utilidade, confiança, etc.).
         
+        Args:
+            asset_id: Identificador do ativo
+            **attributes: Atributos e seus novos valores
+        """
+        if asset_id not in self.assets:
+            raise ValueError("Ativo não encontrado no modelo")
+            
+        self.assets[asset_id].update(attributes)
+        self.vector_cache = None
+
+    def _vector_fingerprint(self) -> Tuple:
+        return tuple(tuple(info[name] for name in self.VECTOR_ATTRIBUTES) for info in self.assets.values())
+
+    def get_normalized_asset_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Retorna a matriz de vetores de ativos normalizados, usando cache.
+
+        O cache é invalidado por `add_asset`, `add_liquidity_pool` e
+        `update_asset`. Atributos alterados diretamente em `assets` também são
+        detectados, comparando os atributos escalares com os do cache.
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Ordem dos ativos e matriz (n_ativos, 6) com linhas de norma
+                unitária (ou nulas, para vetores nulos)
+        """
+        fingerprint = self._vector_fingerprint()
+        if self.vector_cache is None or self.vector_cache[2] != fingerprint:
+            asset_ids = list(self.assets)
+            matrix = self.get_asset_matrix(asset_ids)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            # Vetores nulos (ativo sem liquidez nem atributos) ficam nulos
+            self.vector_cache = (asset_ids, matrix / np.where(norms > 0, norms, 1.0), fingerprint)
+
+        return self.vector_cache[0], self.vector_cache[1]
+
+    def get_asset_values(self, asset_ids: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Retorna o valor unitário de cada ativo (soma do vetor normalizado), como
+        em `calculate_portfolio_value`.
+
+        Args:
+            asset_ids: Ativos desejados, em ordem (padrão: todos, na ordem de `assets`)
+
+        Returns:
+            np.ndarray: Valores unitários (n_ativos,)
+        """
+        all_ids, normalized = self.get_normalized_asset_matrix()
+        values = normalized.sum(axis=1)
+        if asset_ids is None:
+            return values
+
+        index = {asset_id: i for i, asset_id in enumerate(all_ids)}
+        missing = [asset_id for asset_id in asset_ids if asset_id not in index]
+        if missing:
+            raise ValueError(f"Ativos não encontrados no modelo: {missing}")
+        return values[[index[asset_id] for asset_id in asset_ids]]
+
+    def clear_vector_cache(self):
+        """
+        Descarta a matriz de vetores normalizados em cache.
+        """
+        self.vector_cache = None
+
+    def get_portfolio_matrix(self, portfolios, asset_ids: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Converte carteiras em uma matriz de quantidades.
+
+        Args:
+            portfolios: Lista de dicionários com ativos e suas quantidades, ou uma
+                matriz (n_carteiras, n_ativos) já alinhada, devolvida como float
+            asset_ids: Ordem das colunas da matriz (padrão: ordem de `assets`)
+
+        Returns:
+            np.ndarray: Matriz (n_carteiras, n_ativos)
+        """
+        if asset_ids is None:
+            asset_ids = list(self.assets)
+
+        if isinstance(portfolios, np.ndarray):
+            matrix = np.atleast_2d(portfolios).astype(float)
+            if matrix.ndim != 2 or matrix.shape[1] != len(asset_ids):
+                raise ValueError(f"Matriz de carteiras com formato inválido: {portfolios.shape} "
+                                 f"(esperado: (n_carteiras, {len(asset_ids)}))")
+            return matrix
+
+        index = {asset_id: i for i, asset_id in enumerate(asset_ids)}
+        matrix = np.zeros((len(portfolios), len(index)))
+        for p, portfolio in enumerate(portfolios):
+            for asset_id, quantity in portfolio.items():
+                if asset_id not in index:
+                    if asset_id in self.assets:
+                        raise ValueError(f"Ativo {asset_id} adicionado ao modelo depois da criação do estimador")
+                    raise ValueError(f"Ativo {asset_id} não encontrado no modelo")
+                matrix[p, index[asset_id]] = quantity
+        return matrix
+
     def calculate_portfolio_value(self, portfolio: Dict[str, float]) -> float:
         """
         Calcula o valor total de uma carteira considerando todos os fatores.
@@ -418,6 +491,47 @@ class VectorialEconomicModel:
         except nx.NetworkXNoPath:
             return []
             
+    def reachable_assets(self, asset_id: str, max_hops: Optional[int] = None) -> List[str]:
+        """
+        Retorna os ativos alcançáveis a partir de um ativo.
+        
+        Args:
+            asset_id: Ativo de origem
+            max_hops: Número máximo de hops (padrão: sem limite)
+            
+        Returns:
+            List[str]: Ativos alcançáveis, incluindo o próprio ativo
+        """
+        if asset_id not in self.assets:
+            raise ValueError("Ativo não encontrado no modelo")
+            
+        return self.backend.reachable(asset_id, max_hops)
+        
+    def widest_path_liquidity(self, asset_a: str, asset_b: str) -> float:
+        """
+        Calcula a liquidez da rota de maior gargalo entre dois ativos.
+        
+        Args:
+            asset_a: Ativo de origem
+            asset_b: Ativo de destino
+            
+        Returns:
+            float: Maior liquidez mínima entre as pools de uma rota (0.0 se não houver rota)
+        """
+        if asset_a not in self.assets or asset_b not in self.assets:
+            raise ValueError("Ativos não encontrados no modelo")
+            
+        return self.backend.widest_path(asset_a, asset_b)
+        
+    def connected_components(self) -> List[set]:
+        """
+        Retorna os grupos de ativos conectados por pools de liquidez.
+        
+        Returns:
+            List[set]: Conjuntos de ativos de cada componente
+        """
+        return self.backend.components()
+        
     def analyze_route_efficiency(self, asset_a: str, asset_b: str, amount: float) -> Dict[str, List[SwapRoute]]:
         """
         Analisa a eficiência de diferentes rotas entre dois ativos.
@@ -437,23 +551,20 @@ class VectorialEconomicModel:
         paths = self.get_all_possible_routes(asset_a, asset_b)
         
         # Calcula a eficiência de cada rota
-        routes = []
-        for path in paths:
-            effective_rate = self.calculate_effective_rate(path, amount)
+        effective_rates = np.zeros(len(paths))
+        liquidities = np.zeros(len(paths))
+        for r, path in enumerate(paths):
+            effective_rates[r] = self.calculate_effective_rate(path, amount)
             
             # Calcula a liquidez efetiva da rota
             route_liquidity = float('inf')
             for i in range(len(path) - 1):
                 edge_liquidity = self.liquidity_graph[path[i]][path[i+1]]['weight']
                 route_liquidity = min(route_liquidity, edge_liquidity)
-                
-            route = SwapRoute(
-                path=path,
-                total_cost=effective_rate,
-                effective_rate=effective_rate,
-                liquidity=route_liquidity
-            )
-            routes.append(route)
+            liquidities[r] = route_liquidity
+            
+        routes = RouteSet.from_paths(paths, effective_rates, effective_rates, liquidities,
+                                     asset_table=self.asset_table)
             
         # Agrupa as rotas por eficiência
         result = {
@@ -462,31 +573,23 @@ class VectorialEconomicModel:
             'highest_liquidity': []
         }
         
-        if not routes:
+        if not len(routes):
             return result
             
-        # Ordena por taxa efetiva (menor é melhor)
-        routes_by_cost = sorted(routes, key=lambda x: x.effective_rate)
-        result['most_efficient'] = routes_by_cost[:3]  # Top 3 mais eficientes
-        
-        # Ordena por liquidez (maior é melhor)
-        routes_by_liquidity = sorted(routes, key=lambda x: x.liquidity, reverse=True)
-        result['highest_liquidity'] = routes_by_liquidity[:3]  # Top 3 com maior liquidez
-        
         # Rotas balanceadas (média entre eficiência e liquidez)
         if len(routes) > 3:
             # Normaliza custo e liquidez
-            max_cost = max(r.effective_rate for r in routes)
-            max_liquidity = max(r.liquidity for r in routes)
+            normalized_cost = routes.effective_rate / routes.effective_rate.max()
+            normalized_liquidity = 1 - (routes.liquidity / routes.liquidity.max())  # Inverte para que menor seja melhor
             
             # Calcula score balanceado (menor é melhor)
-            for route in routes:
-                normalized_cost = route.effective_rate / max_cost
-                normalized_liquidity = 1 - (route.liquidity / max_liquidity)  # Inverte para que menor seja melhor
-                route.balanced_score = (normalized_cost + normalized_liquidity) / 2
-                
-            # Ordena por score balanceado
-            routes_by_balance = sorted(routes, key=lambda x: x.balanced_score)
-            result['balanced'] = routes_by_balance[:3]  # Top 3 balanceados
+            routes.balanced_score = (normalized_cost + normalized_liquidity) / 2
+            result['balanced'] = routes.top(3, 'balanced_score').to_list()  # Top 3 balanceados
+            
+        # Ordena por taxa efetiva (menor é melhor)
+        result['most_efficient'] = routes.top(3, 'effective_rate').to_list()  # Top 3 mais eficientes
+        
+        # Ordena por liquidez (maior é melhor)
+        result['highest_liquidity'] = routes.top(3, 'liquidity', descending=True).to_list()  # Top 3 com maior liquidez
             
-        return result 
\ No newline at end of file
+        return result
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.vector_model import VectorialEconomicModel
+
+
+def build_model(backend='reference') -> VectorialEconomicModel:
+    """
+    Modelo pequeno com três ativos ligados em triângulo.
+    """
+    model = VectorialEconomicModel(backend=backend)
+    for asset_id, liquidity in (('A', 1000.0), ('B', 2000.0), ('C', 1500.0)):
+        model.add_asset(asset_id, liquidity)
+    model.update_asset('A', volume=100.0, utility=0.5, confidence=0.8)
+    model.update_asset('B', volume=50.0, utility=0.3, confidence=0.6)
+    model.update_asset('C', volume=80.0, utility=0.7, confidence=0.4)
+    model.add_liquidity_pool('A', 'B', 5000.0, swap_fee=0.003)
+    model.add_liquidity_pool('B', 'C', 4000.0, swap_fee=0.002, slippage_model='quadratic')
+    model.add_liquidity_pool('A', 'C', 3000.0, swap_fee=0.005, slippage_model='constant')
+    return model
+
+
+@pytest.fixture
+def model():
+    return build_model()
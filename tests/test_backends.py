@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from src.models.backends import CSGraphBackend, ReferenceBackend, create_backend, csgraph
+from src.models.vector_model import VectorialEconomicModel
+
+requires_scipy = pytest.mark.skipif(csgraph is None, reason="o backend 'csgraph' requer scipy")
+
+
+def random_model(backend, num_assets: int = 40, seed: int = 5) -> VectorialEconomicModel:
+    rng = np.random.default_rng(seed)
+    model = VectorialEconomicModel(backend=backend)
+    for i in range(num_assets):
+        model.add_asset(f'T{i}', rng.uniform(1e5, 1e6))
+    for _ in range(int(num_assets * 1.2)):
+        a, b = rng.choice(num_assets, 2, replace=False)
+        model.add_liquidity_pool(f'T{a}', f'T{b}', rng.uniform(1e4, 1e6), swap_fee=rng.uniform(0.001, 0.005),
+                                 slippage_model=str(rng.choice(['linear', 'quadratic', 'constant'])))
+    model.add_asset('ISOLATED', 1e5)
+    return model
+
+
+@requires_scipy
+def test_csgraph_matches_reference():
+    reference, fast = random_model('reference'), random_model('csgraph')
+    assets = list(reference.assets)
+
+    for a in assets[::4]:
+        for b in assets[1::6]:
+            if a == b:
+                continue
+            for amount in (1000.0, 80000.0, 400000.0):
+                expected = reference.find_best_swap_route(a, b, amount)
+                route = fast.find_best_swap_route(a, b, amount)
+                if expected is None:
+                    assert route is None
+                    continue
+                assert route.total_cost == pytest.approx(expected.total_cost)
+                assert route.liquidity == pytest.approx(expected.liquidity)
+            assert fast.widest_path_liquidity(a, b) == pytest.approx(reference.widest_path_liquidity(a, b))
+        for max_hops in (None, 1, 2):
+            assert set(fast.reachable_assets(a, max_hops)) == set(reference.reachable_assets(a, max_hops))
+
+    assert sorted(map(sorted, fast.connected_components())) == sorted(map(sorted, reference.connected_components()))
+
+
+@requires_scipy
+def test_csgraph_follows_new_pools():
+    reference, fast = random_model('reference'), random_model('csgraph')
+    fast.reachable_assets('T0')
+    for model in (reference, fast):
+        model.add_liquidity_pool('ISOLATED', 'T0', 5e5, swap_fee=0.002)
+
+    assert set(fast.reachable_assets('ISOLATED')) == set(reference.reachable_assets('ISOLATED'))
+    assert fast.find_best_swap_route('ISOLATED', 'T1', 1000.0).total_cost == pytest.approx(
+        reference.find_best_swap_route('ISOLATED', 'T1', 1000.0).total_cost)
+
+
+def test_create_backend_binds_classes_and_instances(model):
+    assert isinstance(create_backend(ReferenceBackend, model), ReferenceBackend)
+
+    backend = ReferenceBackend()
+    other = VectorialEconomicModel(backend=backend)
+    assert other.backend is backend and backend.model is other
+    with pytest.raises(ValueError, match='associado'):
+        create_backend(backend, model)
+
+    with pytest.raises(ValueError, match='não suportado'):
+        create_backend('igraph', model)
+
+
+@requires_scipy
+def test_create_backend_by_name(model):
+    assert isinstance(create_backend('csgraph', model), CSGraphBackend)
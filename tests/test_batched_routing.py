@@ -0,0 +1,86 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.models.batched_routing import EdgeArrays, edge_costs, extract_path, path_reduce, shortest_paths
+from src.models.stress_test import LiquidityShockSimulator
+from src.models.vector_model import VectorialEconomicModel
+
+
+def detour_model() -> VectorialEconomicModel:
+    # S-X é cara; o desvio S-Y-X é mais barato mas usa um hop a mais
+    model = VectorialEconomicModel()
+    for asset_id in ('S', 'X', 'Y', 'T'):
+        model.add_asset(asset_id, 1000.0)
+    model.add_liquidity_pool('S', 'X', 1e6, swap_fee=0.05, slippage_model='none')
+    model.add_liquidity_pool('S', 'Y', 1e6, swap_fee=0.001, slippage_model='none')
+    model.add_liquidity_pool('Y', 'X', 1e6, swap_fee=0.001, slippage_model='none')
+    model.add_liquidity_pool('X', 'T', 1e6, swap_fee=0.001, slippage_model='none')
+    return model
+
+
+@pytest.mark.parametrize('max_hops, expected_path, expected_cost', [
+    (2, ['S', 'X', 'T'], 0.051),
+    (None, ['S', 'Y', 'X', 'T'], 0.003),
+])
+def test_hop_limited_path_matches_cost(max_hops, expected_path, expected_cost):
+    model = detour_model()
+    edges = EdgeArrays.from_model(model)
+    index = {asset_id: i for i, asset_id in enumerate(edges.asset_ids)}
+    costs = edge_costs(edges, np.array([[100.0]]), edges.liquidity[None])
+
+    dist, pred = shortest_paths(edges, np.array([index['S']]), costs, max_hops)
+    path = [edges.asset_ids[i] for i in extract_path(edges, pred[0], index['T'])]
+    total, _, hops = path_reduce(edges, pred, np.array([index['T']]), costs)
+
+    assert dist[0, index['T']] == pytest.approx(expected_cost)
+    assert path == expected_path
+    assert total[0] == pytest.approx(expected_cost)
+    assert hops[0] == len(expected_path) - 1
+
+
+def test_stress_slippage_uses_the_priced_path():
+    model = detour_model()
+    simulator = LiquidityShockSimulator(model, max_hops=2)
+    result = simulator.run([{'S': 100.0}], 'T', np.ones((1, simulator.edges.num_edges)))
+    assert result.costs[0, 0] == pytest.approx(0.051)
+    assert result.slippage[0, 0] == pytest.approx(0.0)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('max_hops', [1, 2, 3, None])
+def test_shortest_paths_match_enumeration(seed, max_hops):
+    rng = np.random.default_rng(seed)
+    model = VectorialEconomicModel()
+    num_assets = 7
+    for i in range(num_assets):
+        model.add_asset(f'T{i}', 1000.0)
+    for _ in range(12):
+        a, b = rng.choice(num_assets, 2, replace=False)
+        model.add_liquidity_pool(f'T{a}', f'T{b}', float(rng.uniform(500, 5000)),
+                                 swap_fee=float(rng.uniform(0.001, 0.05)),
+                                 slippage_model=str(rng.choice(['linear', 'quadratic', 'constant'])))
+
+    edges = EdgeArrays.from_model(model)
+    amount = 400.0
+    liquidity = np.broadcast_to(edges.liquidity, (num_assets, edges.num_edges))
+    costs = edge_costs(edges, np.full((num_assets, 1), amount), liquidity)
+    dist, pred = shortest_paths(edges, np.arange(num_assets), costs, max_hops)
+
+    cost_of = {(edges.asset_ids[u], edges.asset_ids[v]): c
+               for u, v, c in zip(edges.source, edges.target, costs[0])}
+    cutoff = num_assets - 1 if max_hops is None else max_hops
+    for source in range(num_assets):
+        for target in range(num_assets):
+            if source == target:
+                continue
+            paths = nx.all_simple_paths(model.liquidity_graph, edges.asset_ids[source], edges.asset_ids[target],
+                                        cutoff=cutoff)
+            expected = min((sum(cost_of[hop] for hop in zip(path, path[1:])) for path in paths), default=np.inf)
+            assert dist[source, target] == pytest.approx(expected)
+
+            # O caminho percorrido nos predecessores tem o custo informado em dist
+            total, _, hops = path_reduce(edges, pred[[source]], np.array([target]), costs[[source]])
+            if np.isfinite(expected):
+                assert total[0] == pytest.approx(expected)
+                assert hops[0] <= cutoff
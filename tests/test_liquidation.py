@@ -0,0 +1,103 @@
+import copy
+import itertools
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.models.liquidation import LiquidationEngine
+from src.models.slippage import edge_cost
+from src.models.vector_model import VectorialEconomicModel
+
+
+def detour_model() -> VectorialEconomicModel:
+    # S-X é cara; o desvio S-Y-X é mais barato mas usa um hop a mais
+    model = VectorialEconomicModel()
+    for asset_id in ('S', 'X', 'Y', 'T'):
+        model.add_asset(asset_id, 1000.0)
+    model.add_liquidity_pool('S', 'X', 1e6, swap_fee=0.05, slippage_model='none')
+    model.add_liquidity_pool('S', 'Y', 1e6, swap_fee=0.001, slippage_model='none')
+    model.add_liquidity_pool('Y', 'X', 1e6, swap_fee=0.001, slippage_model='none')
+    model.add_liquidity_pool('X', 'T', 1e6, swap_fee=0.001, slippage_model='none')
+    return model
+
+
+@pytest.mark.parametrize('max_hops, route', [
+    (2, ['S', 'X', 'T']),
+    (None, ['S', 'Y', 'X', 'T']),
+])
+def test_sale_depletes_the_priced_route(max_hops, route):
+    model = detour_model()
+    engine = LiquidationEngine(model, max_hops=max_hops)
+    edges = engine.edges
+    index = engine.asset_index
+    holdings = np.zeros((1, len(engine.asset_ids)))
+    holdings[0, index['S']] = 100.0
+
+    liquidity = np.tile(edges.liquidity, (1, 1))
+    engine._simulate_order(holdings, np.array([[index['S']]]), index['T'], liquidity)
+
+    hops = set(zip(route, route[1:]))
+    for e, (u, v) in enumerate(zip(edges.source, edges.target)):
+        pool = (edges.asset_ids[u], edges.asset_ids[v])
+        depleted = pool in hops or pool[::-1] in hops
+        assert liquidity[0, e] == pytest.approx(edges.liquidity[e] - (100.0 if depleted else 0.0))
+
+
+def bridge_model(rng) -> VectorialEconomicModel:
+    # As posições disputam a pool A1-A0 até o alvo; algumas têm rotas diretas mais caras
+    model = VectorialEconomicModel()
+    for i in range(6):
+        model.add_asset(f'A{i}', rng.uniform(1e5, 1e6))
+        model.update_asset(f'A{i}', volume=rng.uniform(1, 1e5), utility=rng.uniform(0.1, 0.9),
+                           confidence=rng.uniform(0.1, 0.9))
+    model.add_liquidity_pool('A0', 'A1', rng.uniform(800, 1500), swap_fee=0.001)
+    for i in range(2, 6):
+        model.add_liquidity_pool('A1', f'A{i}', rng.uniform(2000, 5000), swap_fee=rng.uniform(0.001, 0.02))
+        if rng.random() < 0.7:
+            model.add_liquidity_pool('A0', f'A{i}', rng.uniform(300, 1500), swap_fee=rng.uniform(0.005, 0.03),
+                                     slippage_model=str(rng.choice(['linear', 'quadratic'])))
+    # Desvios baratos entre as posições, que usam um hop a mais
+    for _ in range(2):
+        i, j = rng.choice(np.arange(2, 6), 2, replace=False)
+        model.add_liquidity_pool(f'A{i}', f'A{j}', rng.uniform(2000, 5000), swap_fee=0.001)
+    return model
+
+
+def sale_loss(engine, portfolio, order, target, max_hops):
+    # Vende as posições na ordem dada pela rota mais barata, esgotando as pools usadas
+    graph = copy.deepcopy(engine.model.liquidity_graph)
+    loss = 0.0
+    for asset_id in order:
+        amount = portfolio[asset_id]
+        value = amount * engine.scores[engine.asset_index[asset_id]]
+        best_cost, best_path = np.inf, None
+        for path in nx.all_simple_paths(graph, asset_id, target, cutoff=max_hops):
+            costs = [edge_cost(graph[u][v], amount) for u, v in zip(path, path[1:])]
+            if None not in costs and sum(costs) < best_cost:
+                best_cost, best_path = sum(costs), path
+        if best_path is None:
+            loss += value
+            continue
+        loss += value * min(best_cost, 1.0)
+        for u, v in zip(best_path, best_path[1:]):
+            graph[u][v]['weight'] = max(graph[u][v]['weight'] - amount, 0.0)
+            graph[v][u]['weight'] = max(graph[v][u]['weight'] - amount, 0.0)
+    return loss
+
+
+@pytest.mark.parametrize('max_hops', [None, 1, 2])
+@pytest.mark.parametrize('seed', range(8))
+def test_small_books_match_best_sale_order(seed, max_hops):
+    rng = np.random.default_rng(seed)
+    model = bridge_model(rng)
+    engine = LiquidationEngine(model, max_hops=max_hops)
+    portfolios = [{f'A{i}': float(rng.uniform(100, 900)) for i in rng.choice(np.arange(2, 6), 3, replace=False)}
+                  for _ in range(8)]
+
+    result = engine.liquidate(portfolios, 'A0')
+
+    for p, portfolio in enumerate(portfolios):
+        best = min(sale_loss(engine, portfolio, order, 'A0', max_hops)
+                   for order in itertools.permutations(portfolio))
+        assert result.total_costs[p] == pytest.approx(best)
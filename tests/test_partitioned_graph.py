@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.models.partitioned_graph import PartitionedRouter, partition_assets
+from src.models.vector_model import VectorialEconomicModel
+
+
+def random_model(num_assets: int, seed: int) -> VectorialEconomicModel:
+    rng = np.random.default_rng(seed)
+    model = VectorialEconomicModel()
+    for i in range(num_assets):
+        model.add_asset(f'T{i}', rng.uniform(1e5, 1e6))
+        model.update_asset(f'T{i}', chain=f'chain{i % 3}')
+    for _ in range(int(num_assets * 1.5)):
+        a, b = rng.choice(num_assets, 2, replace=False)
+        model.add_liquidity_pool(f'T{a}', f'T{b}', rng.uniform(1e4, 1e6), swap_fee=rng.uniform(0.001, 0.005),
+                                 slippage_model=str(rng.choice(['linear', 'quadratic', 'constant'])))
+    model.add_asset('ISOLATED', 1e5)
+    model.update_asset('ISOLATED', chain='chain0')
+    return model
+
+
+@pytest.mark.parametrize('asset_id', ['A', 'B'])
+def test_route_to_same_asset_matches_model(model, asset_id):
+    with PartitionedRouter(model, {'A': 0, 'B': 1, 'C': 1}, processes=False) as router:
+        assert router.find_best_swap_route(asset_id, asset_id, 10.0) == model.find_best_swap_route(asset_id, asset_id, 10.0)
+
+
+@pytest.mark.parametrize('num_shards', [1, 4, 1000])
+def test_partition_packs_groups_into_shards(num_shards):
+    model = random_model(60, seed=3)
+    partition = partition_assets(model, num_shards=num_shards)
+    assert set(partition) == set(model.assets)
+    assert len(set(partition.values())) <= num_shards
+
+    partition = partition_assets(model, 'attribute', num_shards=num_shards)
+    assert len(set(partition.values())) == min(num_shards, 3)
+
+
+@pytest.mark.parametrize('processes', [False, True])
+def test_routes_match_full_model(processes):
+    model = random_model(30, seed=3)
+    partition = partition_assets(model, num_shards=4)
+    assets = list(model.assets)
+
+    with PartitionedRouter(model, partition, processes=processes, max_tables=2, max_cached_routes=7) as router:
+        held = []
+        for _ in range(2):
+            for a in assets[::3]:
+                for b in assets[1::4]:
+                    if a == b:
+                        continue
+                    for amount in (1000.0, 50000.0, 300000.0, 7000.0):
+                        expected = model.find_best_swap_route(a, b, amount)
+                        route = router.find_best_swap_route(a, b, amount)
+                        if expected is None:
+                            assert route is None
+                            continue
+                        assert route.path == expected.path
+                        assert route.total_cost == pytest.approx(expected.total_cost)
+                        assert route.effective_rate == pytest.approx(expected.effective_rate)
+                        assert route.liquidity == pytest.approx(expected.liquidity)
+                        held.append((route, route.path, route.total_cost))
+                assert router.widest_path_liquidity(a, assets[1]) == pytest.approx(
+                    model.widest_path_liquidity(a, assets[1]))
+
+        # Rotas já devolvidas continuam válidas depois de saírem do cache
+        assert len(router.route_cache) <= 7
+        assert all(route.path == path and route.total_cost == cost for route, path, cost in held)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from src.models.liquidation import LiquidationEngine
+from src.models.portfolio_optimizer import BatchPortfolioOptimizer
+from src.models.stress_test import LiquidityShockSimulator
+
+PORTFOLIO = {'A': 50.0, 'B': 30.0, 'C': 20.0}
+
+
+def build_engines(model):
+    optimizer = BatchPortfolioOptimizer(model)
+    simulator = LiquidityShockSimulator(model)
+    engine = LiquidationEngine(model)
+    return optimizer, simulator, engine
+
+
+def test_engines_use_their_own_asset_order_after_add_asset(model):
+    optimizer, simulator, engine = build_engines(model)
+    model.add_asset('D', 500.0)
+
+    assert np.isfinite(optimizer.optimize([PORTFOLIO]).values).all()
+    assert np.isfinite(simulator.run([PORTFOLIO], 'A', np.ones((1, simulator.edges.num_edges))).values).all()
+    assert np.isfinite(engine.liquidate([PORTFOLIO], 'A').values).all()
+
+    with pytest.raises(ValueError, match='D'):
+        engine.liquidate([{'D': 1.0}], 'A')
+
+
+def test_portfolio_matrix_validates_columns(model):
+    assert model.get_portfolio_matrix([PORTFOLIO], ['C', 'A', 'B']).tolist() == [[20.0, 50.0, 30.0]]
+    with pytest.raises(ValueError):
+        model.get_portfolio_matrix(np.ones((2, 4)))
+    with pytest.raises(ValueError):
+        model.get_portfolio_matrix([{'X': 1.0}])
+
+
+def test_engines_follow_asset_updates(model):
+    optimizer, simulator, engine = build_engines(model)
+    model.update_asset('A', volume=1e6)
+    expected = model.calculate_portfolio_value(PORTFOLIO)
+
+    assert optimizer.portfolio_values(model.get_portfolio_matrix([PORTFOLIO]))[0] == pytest.approx(expected)
+    assert simulator.run([PORTFOLIO], 'A', np.ones((1, simulator.edges.num_edges))).base_values[0] == \
+        pytest.approx(expected)
+    assert engine.liquidate([PORTFOLIO], 'A').gross_values[0] == pytest.approx(expected)
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from src.models.vector_history import AssetVectorHistory
+
+
+def test_reopen_restores_ticks_and_rejects_other_assets(tmp_path, model):
+    filename = str(tmp_path / 'history.dat')
+    history = AssetVectorHistory(['A', 'B', 'C'], capacity=4, filename=filename)
+    for tick in range(6):
+        history.record(model, timestamp=10.0 + tick)
+    history.flush()
+    expected = np.array(history.window())
+    del history
+
+    reopened = AssetVectorHistory(['A', 'B', 'C'], filename=filename, mode='r+')
+    assert len(reopened) == 4
+    np.testing.assert_array_equal(reopened.window(), expected)
+    np.testing.assert_array_equal(reopened.timestamps(), [12.0, 13.0, 14.0, 15.0])
+    del reopened
+
+    for asset_ids in (['B', 'A', 'C'], ['A', 'B', 'D']):
+        with pytest.raises(ValueError, match='Ativos'):
+            AssetVectorHistory(asset_ids, filename=filename, mode='r+')
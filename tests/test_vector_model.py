@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from src.models.liquidation import LiquidationEngine
+from src.models.portfolio_optimizer import BatchPortfolioOptimizer
+from src.models.stress_test import LiquidityShockSimulator
+
+
+def test_zero_vector_asset_keeps_values_finite(model):
+    model.add_asset('NEW', 0.0)
+    portfolio = {'A': 100.0, 'B': 50.0}
+    expected = model.calculate_portfolio_value(portfolio)
+
+    _, normalized = model.get_normalized_asset_matrix()
+    assert np.isfinite(normalized).all()
+    assert not normalized[-1].any()
+
+    assert BatchPortfolioOptimizer(model).portfolio_values(
+        model.get_portfolio_matrix([portfolio]))[0] == pytest.approx(expected)
+    simulator = LiquidityShockSimulator(model)
+    assert np.isfinite(simulator.run([portfolio], 'A', np.ones((1, simulator.edges.num_edges))).values).all()
+    assert LiquidationEngine(model).liquidate([portfolio], 'A').gross_values[0] == pytest.approx(expected)
+
+
+def test_normalized_cache_follows_direct_attribute_edits(model):
+    _, before = model.get_normalized_asset_matrix()
+    before = before.copy()
+    model.assets['A']['volume'] = 1e6
+    _, after = model.get_normalized_asset_matrix()
+    assert not np.allclose(before[0], after[0])
+    np.testing.assert_allclose(after[0], model.get_asset_vector('A') / np.linalg.norm(model.get_asset_vector('A')))